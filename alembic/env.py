@@ -19,7 +19,7 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 # Import your models here for autogenerate support
-from models import patient_model, bill_model, transaction_model  # adjust import paths
+from models import patient_model, bed_model, bill_model, transaction_model, census_model, uhid_sequence_model, idempotency_model, document_sequence_model  # adjust import paths
 from sqlmodel import SQLModel
 
 target_metadata = SQLModel.metadata  # Use SQLModel metadata for all models
@@ -0,0 +1,162 @@
+"""Store date and time columns as native DATE and TIME
+
+Revision ID: 0a7c3e95b214
+Revises: f2b6d9a4e517
+Create Date: 2026-10-18 15:20:00.000000
+"""
+
+import logging
+from datetime import datetime
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7c3e95b214'
+down_revision: Union[str, Sequence[str], None] = 'f2b6d9a4e517'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DATE_COLUMNS = [
+    ('patientdetails', 'dateofreg'),
+    ('patient_doctor', 'dateofreg'),
+    ('daily_census', 'census_date'),
+    ('transaction_summary', 'admission_date'),
+    ('transaction_summary', 'transaction_date'),
+    ('finalbillsummary', 'admission_date'),
+    ('finalbillsummary', 'discharge_date'),
+]
+
+TIME_COLUMNS = [
+    ('patientdetails', 'time'),
+    ('transaction_summary', 'transaction_time'),
+    ('finalbillsummary', 'admission_time'),
+    ('finalbillsummary', 'discharge_time'),
+]
+
+ACCEPTED_DATE_FORMATS = ("%Y-%m-%d",)
+ACCEPTED_TIME_FORMATS = ("%I:%M:%S %p", "%H:%M:%S", "%I:%M %p", "%H:%M")
+
+# Wire format of each time column, restored by downgrade
+TWELVE_HOUR_COLUMNS = {('patientdetails', 'time')}
+
+# Blank or unparseable values here become NULL; anywhere else they stop the upgrade
+NULLABLE_COLUMNS = {('patientdetails', 'time')}
+# Rows are reported by primary key so they can be fixed by hand
+ROW_KEYS = {'daily_census': 'census_date, patient_type'}
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _parse(value: str, formats) -> Union[datetime, None]:
+    for fmt in formats:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _scan(table: str, column: str, formats, canonical: str) -> tuple[dict, list]:
+    """Return ({value: canonical value} for values to rewrite, [values nothing parses])."""
+    values = op.get_bind().execute(
+        sa.text(f'SELECT DISTINCT "{column}" FROM {table} WHERE "{column}" IS NOT NULL')
+    ).scalars().all()
+    rewrites, bad = {}, []
+    for value in values:
+        parsed = _parse(value, formats)
+        if parsed is None:
+            bad.append(value)
+        elif parsed.strftime(canonical) != value:
+            rewrites[value] = parsed.strftime(canonical)
+    return rewrites, bad
+
+
+def _offending_rows(table: str, column: str, bad: list) -> list:
+    key = ROW_KEYS.get(table, 'id')
+    statement = sa.text(f'SELECT {key} FROM {table} WHERE "{column}" IN :bad ORDER BY {key}')
+    rows = op.get_bind().execute(statement.bindparams(sa.bindparam("bad", expanding=True)), {"bad": bad}).all()
+    return [row[0] if len(row) == 1 else tuple(row) for row in rows]
+
+
+def _clean_text_columns() -> None:
+    """Rewrite every date and time to ISO text so the cast cannot fail.
+
+    Nothing is guessed: if a NOT NULL column holds a value no accepted format
+    parses, the upgrade stops before writing anything and lists the rows.
+    """
+    bind = op.get_bind()
+    plan, problems = [], []
+    columns = [(t, c, ACCEPTED_DATE_FORMATS, "%Y-%m-%d") for t, c in DATE_COLUMNS]
+    columns += [(t, c, ACCEPTED_TIME_FORMATS, "%H:%M:%S") for t, c in TIME_COLUMNS]
+    for table, column, formats, canonical in columns:
+        rewrites, bad = _scan(table, column, formats, canonical)
+        if bad and (table, column) not in NULLABLE_COLUMNS:
+            rows = _offending_rows(table, column, bad)
+            problems.append(f"{table}.{column}: {len(rows)} row(s) {rows[:20]} hold {bad[:5]!r}")
+        plan.append((table, column, rewrites, bad))
+    if problems:
+        raise RuntimeError(
+            "Unparseable dates or times; fix or remove these rows and rerun the upgrade:\n  "
+            + "\n  ".join(problems)
+        )
+
+    for table, column, rewrites, bad in plan:
+        for old, new in rewrites.items():
+            bind.execute(
+                sa.text(f'UPDATE {table} SET "{column}" = :new WHERE "{column}" = :old'),
+                {"new": new, "old": old}
+            )
+        if bad:
+            statement = sa.text(f'UPDATE {table} SET "{column}" = NULL WHERE "{column}" IN :bad')
+            bind.execute(statement.bindparams(sa.bindparam("bad", expanding=True)), {"bad": bad})
+            logger.warning("%s.%s: set %d unparseable value(s) to NULL: %r", table, column, len(bad), bad[:5])
+
+
+def _rewrite_times_to_12h(table: str, column: str) -> None:
+    """SQLite keeps times as text: rewrite 'HH:MM:SS' back to '%I:%M:%S %p'."""
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(f'SELECT rowid, "{column}" FROM {table} WHERE "{column}" IS NOT NULL')).all()
+    for rowid, value in rows:
+        bind.execute(
+            sa.text(f'UPDATE {table} SET "{column}" = :value WHERE rowid = :rowid'),
+            {"value": datetime.strptime(value[:8], "%H:%M:%S").strftime("%I:%M:%S %p"), "rowid": rowid}
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _clean_text_columns()
+
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, column in DATE_COLUMNS:
+            op.alter_column(table, column, type_=sa.Date(), postgresql_using=f'"{column}"::date')
+        for table, column in TIME_COLUMNS:
+            op.alter_column(table, column, type_=sa.Time(), postgresql_using=f'"{column}"::time')
+    # SQLite stores DATE and TIME as ISO text, which the cleanup already wrote
+
+    op.create_index(op.f('ix_patientdetails_dateofreg'), 'patientdetails', ['dateofreg'], unique=False)
+    op.create_index(op.f('ix_finalbillsummary_discharge_date'), 'finalbillsummary', ['discharge_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_finalbillsummary_discharge_date'), table_name='finalbillsummary')
+    op.drop_index(op.f('ix_patientdetails_dateofreg'), table_name='patientdetails')
+
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, column in DATE_COLUMNS:
+            op.alter_column(
+                table, column, type_=sa.String(),
+                postgresql_using=f'to_char("{column}", \'YYYY-MM-DD\')'
+            )
+        for table, column in TIME_COLUMNS:
+            pattern = 'HH12:MI:SS AM' if (table, column) in TWELVE_HOUR_COLUMNS else 'HH24:MI:SS'
+            op.alter_column(
+                table, column, type_=sa.String(),
+                postgresql_using=f'to_char("{column}", \'{pattern}\')'
+            )
+    else:
+        for table, column in TWELVE_HOUR_COLUMNS:
+            _rewrite_times_to_12h(table, column)
@@ -0,0 +1,32 @@
+"""Add bed_board_version counter
+
+Revision ID: 1b8e4d7a2c39
+Revises: 0a7c3e95b214
+Create Date: 2026-10-18 17:10:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '1b8e4d7a2c39'
+down_revision: Union[str, Sequence[str], None] = '0a7c3e95b214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'bed_board_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute("INSERT INTO bed_board_version (id, version) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('bed_board_version')
@@ -0,0 +1,33 @@
+"""Add partial unique index on occupied bed uhid
+
+Revision ID: 2c5f8a1d9e63
+Revises: 1b8e4d7a2c39
+Create Date: 2026-10-18 18:05:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2c5f8a1d9e63'
+down_revision: Union[str, Sequence[str], None] = '1b8e4d7a2c39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Fails if a UHID already occupies two beds; release the duplicate first.
+    """
+    op.create_index(
+        'uq_beddetails_occupied_uhid', 'beddetails', ['uhid'], unique=True,
+        postgresql_where=sa.text("status = 'occupied'"),
+        sqlite_where=sa.text("status = 'occupied'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_beddetails_occupied_uhid', table_name='beddetails')
@@ -1,7 +1,7 @@
 """Add adhar_no column to patient table
 
 Revision ID: 365f6e97d0bc
-Revises: 
+Revises: 9c1b7d2e4f60
 Create Date: 2025-08-27 11:18:07.575634
 """
 
@@ -11,7 +11,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision: str = '365f6e97d0bc'
-down_revision: Union[str, Sequence[str], None] = None
+down_revision: Union[str, Sequence[str], None] = '9c1b7d2e4f60'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
@@ -0,0 +1,63 @@
+"""Add bed_event log and bed_daily_stats rollup
+
+Revision ID: 3d7a2e9f4b16
+Revises: 2c5f8a1d9e63
+Create Date: 2026-10-18 18:40:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime, timezone
+import pytz
+
+# revision identifiers, used by Alembic.
+revision: str = '3d7a2e9f4b16'
+down_revision: Union[str, Sequence[str], None] = '2c5f8a1d9e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'bed_event',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(), nullable=False),
+        sa.Column('event', sa.String(), nullable=False),
+        sa.Column('bed_number', sa.String(), nullable=False),
+        sa.Column('department', sa.String(), nullable=False),
+        sa.Column('uhid', sa.String(), nullable=True),
+        sa.Column('admitted_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_bed_event_occurred_at'), 'bed_event', ['occurred_at'], unique=False)
+    op.create_index('idx_bed_event_bed_number_id', 'bed_event', ['bed_number', 'id'], unique=False)
+    op.create_table(
+        'bed_daily_stats',
+        sa.Column('stat_date', sa.Date(), nullable=False),
+        sa.Column('department', sa.String(), nullable=False),
+        sa.Column('admissions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('discharges', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('occupied_seconds', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('stays', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('stay_seconds', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('stat_date', 'department'),
+    )
+    # No history exists; open a segment for every bed occupied right now
+    op.execute(
+        sa.text("""
+            INSERT INTO bed_event (occurred_at, event, bed_number, department, uhid, admitted_at)
+            SELECT :now, 'baseline', bed_number, department, uhid, :now
+            FROM beddetails
+            WHERE status = 'occupied'
+        """).bindparams(now=datetime.now(timezone.utc).astimezone(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None))
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('bed_daily_stats')
+    op.drop_index('idx_bed_event_bed_number_id', table_name='bed_event')
+    op.drop_index(op.f('ix_bed_event_occurred_at'), table_name='bed_event')
+    op.drop_table('bed_event')
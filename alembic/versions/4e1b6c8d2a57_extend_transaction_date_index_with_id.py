@@ -0,0 +1,28 @@
+"""Extend idx_transaction_date to (transaction_date, id)
+
+Revision ID: 4e1b6c8d2a57
+Revises: 3d7a2e9f4b16
+Create Date: 2026-10-18 19:20:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '4e1b6c8d2a57'
+down_revision: Union[str, Sequence[str], None] = '3d7a2e9f4b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GET /transactions pages on (transaction_date, id); date-range reads still use the prefix
+    op.drop_index('idx_transaction_date', table_name='transaction_summary')
+    op.create_index('idx_transaction_date', 'transaction_summary', ['transaction_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_transaction_date', table_name='transaction_summary')
+    op.create_index('idx_transaction_date', 'transaction_summary', ['transaction_date'], unique=False)
@@ -0,0 +1,46 @@
+"""Add idempotency_key store and active final bill number unique index
+
+Revision ID: 5f3c9b7e1d24
+Revises: 4e1b6c8d2a57
+Create Date: 2026-10-18 19:55:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3c9b7e1d24'
+down_revision: Union[str, Sequence[str], None] = '4e1b6c8d2a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    The bill index fails if a final_bill_no has two ACTIVE bills; cancel the duplicate first.
+    """
+    op.create_table(
+        'idempotency_key',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('endpoint', sa.String(), nullable=False),
+        sa.Column('request_hash', sa.String(), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('response_body', sa.JSON(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key', 'endpoint'),
+    )
+    op.create_index(op.f('ix_idempotency_key_expires_at'), 'idempotency_key', ['expires_at'], unique=False)
+    op.create_index(
+        'uq_finalbillsummary_active_bill_no', 'finalbillsummary', ['final_bill_no'], unique=True,
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+        sqlite_where=sa.text("status = 'ACTIVE'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_finalbillsummary_active_bill_no', table_name='finalbillsummary')
+    op.drop_index(op.f('ix_idempotency_key_expires_at'), table_name='idempotency_key')
+    op.drop_table('idempotency_key')
@@ -0,0 +1,32 @@
+"""Add document_sequence for server-issued transaction and bill numbers
+
+Revision ID: 6a8d4f2c9e71
+Revises: 5f3c9b7e1d24
+Create Date: 2026-10-18 20:30:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6a8d4f2c9e71'
+down_revision: Union[str, Sequence[str], None] = '5f3c9b7e1d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'document_sequence',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('period', sa.String(), nullable=False),
+        sa.Column('last_serial', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('name', 'period'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('document_sequence')
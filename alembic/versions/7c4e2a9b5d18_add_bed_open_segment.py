@@ -0,0 +1,38 @@
+"""Keep each bed's open occupancy segment on beddetails
+
+Revision ID: 7c4e2a9b5d18
+Revises: 6a8d4f2c9e71
+Create Date: 2026-10-18 21:15:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e2a9b5d18'
+down_revision: Union[str, Sequence[str], None] = '6a8d4f2c9e71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('beddetails', sa.Column('occupied_since', sa.DateTime(), nullable=True))
+    op.add_column('beddetails', sa.Column('admitted_at', sa.DateTime(), nullable=True))
+    # Backfill from the latest event of each occupied bed, if it opened a segment
+    op.execute("""
+        UPDATE beddetails
+        SET occupied_since = latest.occurred_at,
+            admitted_at = COALESCE(latest.admitted_at, latest.occurred_at)
+        FROM bed_event AS latest
+        WHERE beddetails.status = 'occupied'
+          AND latest.id = (SELECT MAX(e.id) FROM bed_event e WHERE e.bed_number = beddetails.bed_number)
+          AND latest.event IN ('allot', 'shift_in', 'baseline')
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('beddetails', 'admitted_at')
+    op.drop_column('beddetails', 'occupied_since')
@@ -0,0 +1,25 @@
+"""Add (patient_uhid, patient_regno) index on finalbillsummary
+
+Revision ID: 8e3f1a6c4b92
+Revises: 7c4e2a9b5d18
+Create Date: 2026-10-18 23:40:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3f1a6c4b92'
+down_revision: Union[str, Sequence[str], None] = '7c4e2a9b5d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_finalbillsummary_visit', 'finalbillsummary', ['patient_uhid', 'patient_regno'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_finalbillsummary_visit', table_name='finalbillsummary')
@@ -0,0 +1,135 @@
+"""Create the base tables that used to be created at import time
+
+Revision ID: 9c1b7d2e4f60
+Revises: 
+Create Date: 2026-10-18 16:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1b7d2e4f60'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created by the old create_db_and_tables() already have these
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'patientdetails' not in existing:
+        op.create_table(
+            'patientdetails',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('uhid', sa.String(), nullable=True),
+            sa.Column('title', sa.String(), nullable=True),
+            sa.Column('fullname', sa.String(), nullable=False),
+            sa.Column('sex', sa.String(), nullable=True),
+            sa.Column('mobile', sa.String(), nullable=True),
+            sa.Column('dateofreg', sa.String(), nullable=False),
+            sa.Column('regno', sa.String(), nullable=True),
+            sa.Column('time', sa.String(), nullable=True),
+            sa.Column('age', sa.Integer(), nullable=True),
+            sa.Column('patient_type', sa.String(), nullable=False),
+            sa.Column('empanelment', sa.String(), nullable=True),
+            sa.Column('religion', sa.String(), nullable=False),
+            sa.Column('maritalStatus', sa.String(), nullable=False),
+            sa.Column('fatherHusband', sa.String(), nullable=False),
+            sa.Column('doctorIncharge', sa.JSON(), nullable=True),
+            sa.Column('regAmount', sa.Integer(), nullable=False),
+            sa.Column('localAddress', sa.JSON(), nullable=True),
+            sa.Column('permanentAddress', sa.JSON(), nullable=True),
+            sa.Column('registered_by', sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_patientdetails_uhid'), 'patientdetails', ['uhid'], unique=False)
+
+    if 'beddetails' not in existing:
+        op.create_table(
+            'beddetails',
+            sa.Column('bed_id', sa.Integer(), nullable=False),
+            sa.Column('uhid', sa.String(), nullable=True),
+            sa.Column('patient_name', sa.String(), nullable=False),
+            sa.Column('department', sa.String(), nullable=False),
+            sa.Column('bed_number', sa.String(), nullable=False),
+            sa.Column('status', sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint('bed_id'),
+            sa.UniqueConstraint('bed_number'),
+        )
+        op.create_index(op.f('ix_beddetails_uhid'), 'beddetails', ['uhid'], unique=False)
+
+    if 'finalbillsummary' not in existing:
+        op.create_table(
+            'finalbillsummary',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('final_bill_no', sa.String(), nullable=False),
+            sa.Column('patient_uhid', sa.String(), nullable=False),
+            sa.Column('patient_regno', sa.String(), nullable=False),
+            sa.Column('patient_name', sa.String(), nullable=False),
+            sa.Column('patient_type', sa.String(), nullable=False),
+            sa.Column('age', sa.String(), nullable=False),
+            sa.Column('gender', sa.String(), nullable=False),
+            sa.Column('admission_date', sa.String(), nullable=False),
+            sa.Column('admission_time', sa.String(), nullable=False),
+            sa.Column('discharge_date', sa.String(), nullable=False),
+            sa.Column('discharge_time', sa.String(), nullable=False),
+            sa.Column('consultant_doctor', sa.String(), nullable=False),
+            sa.Column('empanelment', sa.String(), nullable=False),
+            sa.Column('room_type', sa.String(), nullable=False),
+            sa.Column('bed_no', sa.String(), nullable=False),
+            sa.Column('reg_amount', sa.Numeric(), nullable=True),
+            sa.Column('charges_summary', sa.JSON(), nullable=True),
+            sa.Column('transaction_breakdown', sa.JSON(), nullable=True),
+            sa.Column('total_charges', sa.Numeric(), nullable=True),
+            sa.Column('total_discount', sa.JSON(), nullable=True),
+            sa.Column('net_amount', sa.Numeric(), nullable=True),
+            sa.Column('total_paid', sa.Numeric(), nullable=True),
+            sa.Column('balance', sa.Numeric(), nullable=True),
+            sa.Column('created_by', sa.String(), nullable=False),
+            sa.Column('status', sa.String(), nullable=False),
+            sa.Column('cancelled_by', sa.String(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_finalbillsummary_final_bill_no'), 'finalbillsummary', ['final_bill_no'], unique=False)
+        op.create_index(op.f('ix_finalbillsummary_status'), 'finalbillsummary', ['status'], unique=False)
+
+    if 'transaction_summary' not in existing:
+        op.create_table(
+            'transaction_summary',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('patient_uhid', sa.String(), nullable=False),
+            sa.Column('patient_regno', sa.String(), nullable=False),
+            sa.Column('patient_name', sa.String(), nullable=False),
+            sa.Column('admission_date', sa.String(), nullable=False),
+            sa.Column('transaction_purpose', sa.String(), nullable=False),
+            sa.Column('amount', sa.Numeric(), nullable=True),
+            sa.Column('payment_mode', sa.String(), nullable=False),
+            sa.Column('payment_details', sa.JSON(), nullable=True),
+            sa.Column('transaction_date', sa.String(), nullable=False),
+            sa.Column('transaction_time', sa.String(), nullable=False),
+            sa.Column('transaction_no', sa.String(), nullable=False),
+            sa.Column('created_by', sa.String(), nullable=False),
+            sa.Column('status', sa.String(), nullable=False),
+            sa.Column('cancelled_by', sa.String(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('transaction_no'),
+        )
+        op.create_index('idx_patient_visit', 'transaction_summary', ['patient_uhid', 'patient_regno'], unique=False)
+        op.create_index('idx_transaction_no', 'transaction_summary', ['transaction_no'], unique=True)
+        op.create_index('idx_transaction_date', 'transaction_summary', ['transaction_date'], unique=False)
+        op.create_index('idx_status', 'transaction_summary', ['status'], unique=False)
+        op.create_index(op.f('ix_transaction_summary_patient_uhid'), 'transaction_summary', ['patient_uhid'], unique=False)
+        op.create_index(op.f('ix_transaction_summary_patient_regno'), 'transaction_summary', ['patient_regno'], unique=False)
+        op.create_index(op.f('ix_transaction_summary_status'), 'transaction_summary', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('transaction_summary')
+    op.drop_table('finalbillsummary')
+    op.drop_table('beddetails')
+    op.drop_table('patientdetails')
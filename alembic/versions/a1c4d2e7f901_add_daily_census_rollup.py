@@ -0,0 +1,52 @@
+"""Add daily_census rollup table
+
+Revision ID: a1c4d2e7f901
+Revises: 365f6e97d0bc
+Create Date: 2026-10-18 10:05:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c4d2e7f901'
+down_revision: Union[str, Sequence[str], None] = '365f6e97d0bc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'daily_census',
+        sa.Column('census_date', sa.String(), nullable=False),
+        sa.Column('patient_type', sa.String(), nullable=False),
+        sa.Column('registrations', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('discharges', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cancellations', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('census_date', 'patient_type'),
+    )
+    # Backfill from history (same logic as `python -m services.census rebuild`)
+    op.execute("""
+        INSERT INTO daily_census (census_date, patient_type, registrations, discharges, cancellations)
+        SELECT census_date, patient_type, SUM(registrations), SUM(discharges), SUM(cancellations)
+        FROM (
+            SELECT dateofreg AS census_date, patient_type,
+                   COUNT(*) AS registrations, 0 AS discharges, 0 AS cancellations
+            FROM patientdetails
+            GROUP BY dateofreg, patient_type
+            UNION ALL
+            SELECT discharge_date, patient_type,
+                   0, COUNT(*), SUM(CASE WHEN status = 'CANCELLED' THEN 1 ELSE 0 END)
+            FROM finalbillsummary
+            GROUP BY discharge_date, patient_type
+        ) AS history
+        WHERE census_date IS NOT NULL AND patient_type IS NOT NULL
+        GROUP BY census_date, patient_type
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_census')
@@ -0,0 +1,39 @@
+"""Add uhid_sequence table for per-month UHID allocation
+
+Revision ID: b7e2f05c3a18
+Revises: a1c4d2e7f901
+Create Date: 2026-10-18 10:40:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2f05c3a18'
+down_revision: Union[str, Sequence[str], None] = 'a1c4d2e7f901'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'uhid_sequence',
+        sa.Column('period', sa.String(), nullable=False),
+        sa.Column('last_serial', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('period'),
+    )
+    # Continue every month's numbering after the highest UHID already issued
+    op.execute("""
+        INSERT INTO uhid_sequence (period, last_serial)
+        SELECT SUBSTR(uhid, 1, 4), MAX(CAST(SUBSTR(uhid, 5, 4) AS INTEGER))
+        FROM patientdetails
+        WHERE uhid IS NOT NULL AND LENGTH(uhid) = 8
+        GROUP BY SUBSTR(uhid, 1, 4)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('uhid_sequence')
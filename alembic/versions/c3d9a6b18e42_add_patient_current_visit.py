@@ -0,0 +1,43 @@
+"""Add patient_current_visit pointer table
+
+Revision ID: c3d9a6b18e42
+Revises: b7e2f05c3a18
+Create Date: 2026-10-18 11:15:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9a6b18e42'
+down_revision: Union[str, Sequence[str], None] = 'b7e2f05c3a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'patient_current_visit',
+        sa.Column('uhid', sa.String(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['patient_id'], ['patientdetails.id']),
+        sa.PrimaryKeyConstraint('uhid'),
+    )
+    # Point every UHID at its highest regno (newest row on ties)
+    op.execute("""
+        INSERT INTO patient_current_visit (uhid, patient_id)
+        SELECT p.uhid, MAX(p.id)
+        FROM patientdetails p
+        WHERE p.uhid IS NOT NULL
+          AND p.regno = (
+              SELECT MAX(q.regno) FROM patientdetails q WHERE q.uhid = p.uhid
+          )
+        GROUP BY p.uhid
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('patient_current_visit')
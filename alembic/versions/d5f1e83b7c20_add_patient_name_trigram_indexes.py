@@ -0,0 +1,39 @@
+"""Add trigram indexes for patient name search
+
+Revision ID: d5f1e83b7c20
+Revises: c3d9a6b18e42
+Create Date: 2026-10-18 12:30:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1e83b7c20'
+down_revision: Union[str, Sequence[str], None] = 'c3d9a6b18e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only Postgres has pg_trgm; other databases use the in-process n-gram index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_patientdetails_fullname_trgm '
+        'ON patientdetails USING gin (fullname gin_trgm_ops)'
+    )
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_patientdetails_fatherhusband_trgm '
+        'ON patientdetails USING gin ("fatherHusband" gin_trgm_ops)'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP INDEX IF EXISTS ix_patientdetails_fatherhusband_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_patientdetails_fullname_trgm')
@@ -0,0 +1,25 @@
+"""Add index on patientdetails.mobile
+
+Revision ID: e8a4c1f6d392
+Revises: d5f1e83b7c20
+Create Date: 2026-10-18 13:05:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a4c1f6d392'
+down_revision: Union[str, Sequence[str], None] = 'd5f1e83b7c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_patientdetails_mobile'), 'patientdetails', ['mobile'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_patientdetails_mobile'), table_name='patientdetails')
@@ -0,0 +1,57 @@
+"""Add patient_doctor assignment table
+
+Revision ID: f2b6d9a4e517
+Revises: e8a4c1f6d392
+Create Date: 2026-10-18 13:50:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d9a4e517'
+down_revision: Union[str, Sequence[str], None] = 'e8a4c1f6d392'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'patient_doctor',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('doctor', sa.String(), nullable=False),
+        sa.Column('dateofreg', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['patient_id'], ['patientdetails.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_patient_doctor_patient_id'), 'patient_doctor', ['patient_id'], unique=False)
+    op.create_index('idx_patient_doctor_doctor_date', 'patient_doctor', ['doctor', 'dateofreg'], unique=False)
+
+    # Backfill one row per distinct doctor name in each doctorIncharge array
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            INSERT INTO patient_doctor (patient_id, doctor, dateofreg)
+            SELECT DISTINCT p.id, TRIM(d.doctor), p.dateofreg
+            FROM patientdetails p
+            CROSS JOIN LATERAL json_array_elements_text(p."doctorIncharge"::json) AS d(doctor)
+            WHERE json_typeof(p."doctorIncharge"::json) = 'array'
+              AND TRIM(d.doctor) <> ''
+        """)
+    else:
+        op.execute("""
+            INSERT INTO patient_doctor (patient_id, doctor, dateofreg)
+            SELECT DISTINCT p.id, TRIM(d.value), p.dateofreg
+            FROM patientdetails p, json_each(p."doctorIncharge") AS d
+            WHERE json_type(p."doctorIncharge") = 'array'
+              AND TRIM(d.value) <> ''
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_patient_doctor_doctor_date', table_name='patient_doctor')
+    op.drop_index(op.f('ix_patient_doctor_patient_id'), table_name='patient_doctor')
+    op.drop_table('patient_doctor')
@@ -0,0 +1,118 @@
+"""Server CPU spent holding idle /beds/stream subscribers.
+
+Starts uvicorn in a subprocess, measures its CPU over an idle window with no
+subscribers, then opens SUBSCRIBERS streams (each reads its snapshot frame)
+and measures the same window again. CPU comes from /proc, so Linux only.
+
+    python -m bench.bed_stream_idle [--subscribers 100] [--idle 30]
+
+Uses Prod_DB_URL when set (run `alembic upgrade head` first); otherwise a
+throwaway SQLite file with the tables created from the models.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 of the full line
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare_env() -> dict:
+    env = dict(os.environ, API_KEY=os.getenv("API_KEY", "bench"), SYNC_BEDS_ON_STARTUP="false")
+    if not env.get("Prod_DB_URL"):
+        env["Prod_DB_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='kkhospital-bench-'), 'bench.db')}"
+        subprocess.run(
+            [sys.executable, "-c", "import main; from sqlmodel import SQLModel; SQLModel.metadata.create_all(main.engine)"],
+            env=env, check=True,
+        )
+    return env
+
+
+async def wait_until_up(base: str):
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(f"{base}/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def subscribe(client: httpx.AsyncClient, url: str, opened: asyncio.Event, counter: list, total: int):
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.startswith("event: snapshot"):
+                counter[0] += 1
+                if counter[0] == total:
+                    opened.set()
+            # Keep reading so heartbeats are consumed like a browser would
+
+
+async def run(subscribers: int, idle: float):
+    env = prepare_env()
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        await wait_until_up(base)
+
+        start = cpu_seconds(server.pid)
+        await asyncio.sleep(idle)
+        baseline = cpu_seconds(server.pid) - start
+
+        limits = httpx.Limits(max_connections=subscribers + 1)
+        async with httpx.AsyncClient(base_url=base, limits=limits, timeout=None) as client:
+            token = (await client.post("/beds/stream/token", headers={"x-api-key": env["API_KEY"]})).json()["token"]
+            opened, counter = asyncio.Event(), [0]
+            tasks = [
+                asyncio.create_task(subscribe(client, f"/beds/stream?token={token}", opened, counter, subscribers))
+                for _ in range(subscribers)
+            ]
+            connect_started = time.perf_counter()
+            await asyncio.wait_for(opened.wait(), timeout=60)
+            connect_time = time.perf_counter() - connect_started
+
+            start = cpu_seconds(server.pid)
+            await asyncio.sleep(idle)
+            loaded = cpu_seconds(server.pid) - start
+
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{subscribers} subscribers opened in {connect_time:.2f}s")
+    print(f"server CPU over {idle:.0f}s idle: {baseline:.3f}s with none, {loaded:.3f}s with {subscribers}"
+          f" ({100 * loaded / idle:.2f}% of one core)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=100)
+    parser.add_argument("--idle", type=float, default=30.0, help="seconds in each measured window")
+    args = parser.parse_args()
+    asyncio.run(run(args.subscribers, args.idle))
@@ -0,0 +1,66 @@
+"""Registration throughput: one POST /patient per row vs POST /patient/bulk.
+
+Both paths go through the app in-process with TestClient on a freshly reset
+database. Each registers ROWS patients and reports patients per second.
+
+    python -m bench.bulk_registration [--rows 2000]
+"""
+import argparse
+import time
+
+from bench.common import reset_schema, use_scratch_database
+
+use_scratch_database()
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlmodel import Session, func, select  # noqa: E402
+
+import main  # noqa: E402
+from models.patient_model import PatientDetails  # noqa: E402
+from routers.patient import BULK_MAX_ROWS  # noqa: E402
+
+
+ADDRESS = {"address": "a", "city": "Lucknow", "state": "UP", "country": "IN", "zip": "226001"}
+PATIENT = {
+    "fullname": "Bench Patient", "patient_type": "OPD", "religion": "r", "maritalStatus": "m",
+    "fatherHusband": "f", "doctorIncharge": ["D"], "regAmount": 10,
+    "localAddress": ADDRESS, "permanentAddress": ADDRESS, "registered_by": "bench",
+}
+
+
+def one_by_one(client: TestClient, rows: list):
+    for row in rows:
+        client.post("/patient", json=row).raise_for_status()
+
+
+def bulk(client: TestClient, rows: list):
+    for start in range(0, len(rows), BULK_MAX_ROWS):
+        result = client.post("/patient/bulk", json=rows[start:start + BULK_MAX_ROWS]).json()
+        assert result["failed"] == 0, result["errors"][:3]
+
+
+def timed_run(path, rows: list) -> float:
+    engine = reset_schema()
+    with TestClient(main.app, headers={"x-api-key": main.API_KEY}) as client:
+        started = time.perf_counter()
+        path(client, rows)
+        elapsed = time.perf_counter() - started
+    with Session(engine) as db:
+        assert db.exec(select(func.count()).select_from(PatientDetails)).one() == len(rows)
+    return elapsed
+
+
+def run(count: int):
+    rows = [{**PATIENT, "fullname": f"Bench Patient {n}"} for n in range(count)]
+    old = timed_run(one_by_one, rows)
+    new = timed_run(bulk, rows)
+    print(f"{count:,} registrations ({main.engine.dialect.name})")
+    print(f"old  POST /patient per row: {old:7.2f}s  {count / old:8.0f} patients/s")
+    print(f"new  POST /patient/bulk:    {new:7.2f}s  {count / new:8.0f} patients/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,42 @@
+"""Setup shared by the benchmarks that seed their own rows.
+
+Call use_scratch_database() before importing any app module, because
+database.py builds its engine from Prod_DB_URL at import time. BENCH_DB_URL
+selects the database. It is wiped, so never point it at real data. Without
+it a throwaway SQLite file is used.
+"""
+import os
+import tempfile
+import time
+from typing import Callable
+
+
+def use_scratch_database() -> str:
+    url = os.getenv("BENCH_DB_URL") or (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='kkhospital-bench-'), 'bench.db')}"
+    )
+    os.environ["Prod_DB_URL"] = url
+    os.environ.setdefault("API_KEY", "bench")
+    os.environ["SYNC_BEDS_ON_STARTUP"] = "false"
+    return url
+
+
+def reset_schema():
+    """Drop and recreate every table from the models."""
+    import main  # noqa: F401  (imports every model)
+    from database import engine
+    from sqlmodel import SQLModel
+
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def best_of(repeat: int, fn: Callable, *args, **kwargs) -> tuple[float, object]:
+    """Fastest of `repeat` runs in seconds, with the last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - started)
+    return best, result
@@ -0,0 +1,104 @@
+"""/insights/collections against a synthetic transaction table.
+
+Seeds ROWS transactions spread over the last DAYS days: four payment modes,
+three purposes and about 5% cancelled. It then times the two paths:
+
+  old  every transaction read and summed in Python, which is what the front
+       end did after downloading GET /transactions
+  new  the single GROUP BY behind /insights/collections, for 30 and 365 days
+
+It also checks that both paths give the same 30-day totals.
+
+    python -m bench.insights_collections [--rows 1000000] [--days 365]
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from bench.common import best_of, reset_schema, use_scratch_database
+
+use_scratch_database()
+
+from sqlalchemy import insert  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from models.transaction_model import TransactionSummary  # noqa: E402
+from routers.patient_insights import get_collections  # noqa: E402
+
+
+PAYMENT_MODES = ("CASH", "UPI", "CARD", "TPA")
+PURPOSES = ("ADVANCE", "REGISTRATION", "FINAL_SETTLEMENT")
+SEED_BATCH = 20_000
+
+
+def seed(engine, rows: int, days: int):
+    rng = random.Random(13)
+    today = date.today()
+    with engine.begin() as conn:
+        for start in range(0, rows, SEED_BATCH):
+            conn.execute(insert(TransactionSummary), [
+                {
+                    "patient_uhid": f"2610{n % 9999 + 1:04d}",
+                    "patient_regno": "001",
+                    "patient_name": "Bench",
+                    "admission_date": today.isoformat(),
+                    "transaction_purpose": rng.choice(PURPOSES),
+                    "amount": Decimal(rng.randrange(100, 5_000_000)) / 100,
+                    "payment_mode": rng.choice(PAYMENT_MODES),
+                    "transaction_date": (today - timedelta(days=rng.randrange(days))).isoformat(),
+                    "transaction_time": "10:00:00",
+                    "transaction_no": f"BENCH{n:09d}",
+                    "created_by": "bench",
+                    "status": "CANCELLED" if rng.random() < 0.05 else "ACTIVE",
+                }
+                for n in range(start, min(start + SEED_BATCH, rows))
+            ])
+
+
+def old_totals(db: Session, date_from: str, date_to: str) -> dict:
+    totals = defaultdict(Decimal)
+    for txn in db.exec(select(TransactionSummary).execution_options(yield_per=10_000)):
+        if txn.status == "ACTIVE" and date_from <= txn.transaction_date <= date_to:
+            totals[(txn.transaction_date, txn.payment_mode, txn.transaction_purpose)] += txn.amount
+    return {key: f"{total:.2f}" for key, total in totals.items()}
+
+
+def new_totals(db: Session, date_from: str, date_to: str) -> dict:
+    result = get_collections(date_from=date_from, date_to=date_to, db=db)
+    return {
+        (row["date"], row["payment_mode"], row["transaction_purpose"]): row["total"]
+        for row in result["collections"]
+    }
+
+
+def main(rows: int, days: int, repeat: int):
+    engine = reset_schema()
+    started = time.perf_counter()
+    seed(engine, rows, days)
+    print(f"seeded {rows:,} transactions over {days} days in {time.perf_counter() - started:.1f}s"
+          f" ({engine.dialect.name})")
+
+    today = date.today()
+    month = ((today - timedelta(days=29)).isoformat(), today.isoformat())
+    year = ((today - timedelta(days=364)).isoformat(), today.isoformat())
+    with Session(engine) as db:
+        old_time, old_result = best_of(1, old_totals, db, *month)
+        month_time, month_result = best_of(repeat, new_totals, db, *month)
+        year_time, _ = best_of(repeat, new_totals, db, *year)
+
+    assert old_result == month_result, "old and new 30-day totals differ"
+    print(f"old  read every row and sum in Python: {old_time * 1000:9.1f} ms")
+    print(f"new  GROUP BY, 30 days:                 {month_time * 1000:9.1f} ms")
+    print(f"new  GROUP BY, 365 days:                {year_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per new-path timing; the best is reported")
+    args = parser.parse_args()
+    main(args.rows, args.days, args.repeat)
@@ -0,0 +1,102 @@
+"""Worker startup: database work at boot, then a cold process boot.
+
+The database is seeded with the full bed inventory first, the state every
+worker boot after the first one sees.
+
+  old  what importing the routers used to do: four CREATE TABLE checkfirst
+       calls and one SELECT per bed in bed_inventory.json
+  new  the lifespan hook: sync_bed_inventory's single INSERT ... ON CONFLICT
+
+--latency-ms adds a sleep before every statement to stand in for the round
+trip to a remote database. The cold boot starts a fresh interpreter that
+imports main and runs the lifespan.
+
+    python -m bench.startup [--latency-ms 0] [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from bench.common import best_of, reset_schema, use_scratch_database
+
+use_scratch_database()
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+import main  # noqa: E402
+from models.bed_model import BedDetails  # noqa: E402
+from models.bill_model import FinalBillSummary  # noqa: E402
+from models.patient_model import PatientDetails  # noqa: E402
+from models.transaction_model import TransactionSummary  # noqa: E402
+from services.beds import load_bed_inventory, sync_bed_inventory  # noqa: E402
+
+
+COLD_BOOT = (
+    "import time; started = time.perf_counter()\n"
+    "import main\n"
+    "from fastapi.testclient import TestClient\n"
+    "with TestClient(main.app): pass\n"
+    "print(time.perf_counter() - started)\n"
+)
+
+
+def old_startup(engine):
+    for table in (PatientDetails, BedDetails, TransactionSummary, FinalBillSummary):
+        table.__table__.create(engine, checkfirst=True)
+    with Session(engine) as session:
+        for dept in load_bed_inventory():
+            for bed_number in dept["beds"]:
+                existing_bed = session.exec(select(BedDetails).where(BedDetails.bed_number == bed_number)).first()
+                if not existing_bed:
+                    session.add(BedDetails(department=dept["name"], bed_number=bed_number, patient_name="", status="available"))
+        session.commit()
+
+
+def new_startup():
+    with TestClient(main.app):
+        pass
+
+
+def run(latency_ms: float, repeat: int):
+    # The lifespan reads this per start; the cold boots inherit it
+    os.environ["SYNC_BEDS_ON_STARTUP"] = "true"
+    engine = reset_schema()
+    with Session(engine) as session:
+        beds = sync_bed_inventory(session)
+
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        statements[0] += 1
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+
+    results = {}
+    for name, path in (("old", lambda: old_startup(engine)), ("new", new_startup)):
+        statements[0] = 0
+        elapsed, _ = best_of(repeat, path)
+        results[name] = (elapsed, statements[0] // repeat)
+    event.remove(engine, "before_cursor_execute", count)
+
+    cold = min(
+        float(subprocess.run([sys.executable, "-c", COLD_BOOT], capture_output=True, text=True, check=True).stdout)
+        for _ in range(repeat)
+    )
+
+    print(f"{beds} beds, {engine.dialect.name}, {latency_ms:g} ms added per statement")
+    print(f"old  create tables + SELECT per bed: {results['old'][0] * 1000:8.1f} ms  {results['old'][1]:4d} statements")
+    print(f"new  lifespan bulk upsert:           {results['new'][0] * 1000:8.1f} ms  {results['new'][1]:4d} statements")
+    print(f"cold boot (import main + lifespan):  {cold * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated round trip per statement")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.latency_ms, args.repeat)
@@ -1,3 +1,4 @@
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import create_engine
 from dotenv import load_dotenv
 import os
@@ -11,4 +12,14 @@ Prod_DB_URL = os.getenv("Prod_DB_URL")
 
 
 # engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-engine = create_engine(Prod_DB_URL)
\ No newline at end of file
+engine = create_engine(Prod_DB_URL)
+
+
+def on_conflict_insert(db, table):
+    """INSERT construct with ON CONFLICT support for the session's backend."""
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        return postgresql.insert(table)
+    if name == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"ON CONFLICT inserts are not supported on {name}")
@@ -1,15 +1,22 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
 from routers.patient import router as patient_router
-from routers.bed_alot import router as bed_router
+from routers.bed_alot import router as bed_router, stream_router as bed_stream_router
 from routers.tpa import router as tpa_router
 from routers.transaction import router as transaction_router
 from routers.bill import router as bill_router
 from routers.patient_insights import router as insights_router
 from dotenv import load_dotenv
 import os
+from sqlmodel import Session
 from starlette.responses import JSONResponse
+from database import engine
+from services.beds import sync_bed_inventory
+from services.bed_board import PgNotifyBedEventBus, set_bed_event_bus
+from services.patient_cache import PgNotifyPatientCacheBus, set_patient_cache_bus
 
 # Load environment variables from .env file
 load_dotenv()
@@ -25,11 +32,36 @@ if not API_KEY:
 # Define API key security scheme for OpenAPI (Swagger UI)
 api_key_header = APIKeyHeader(name="x-api-key", auto_error=False)
 
+def sync_beds_on_startup():
+    with Session(engine) as session:
+        sync_bed_inventory(session)
+
+
+# Schema is managed by Alembic (`alembic upgrade head`); startup only adds missing beds
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bed board changes and patient cache invalidations reach every worker
+    # through Postgres LISTEN/NOTIFY
+    buses = []
+    if engine.dialect.name == "postgresql":
+        buses = [PgNotifyBedEventBus(engine), PgNotifyPatientCacheBus(engine)]
+        set_bed_event_bus(buses[0])
+        set_patient_cache_bus(buses[1])
+        for bus in buses:
+            bus.start()
+    if os.getenv("SYNC_BEDS_ON_STARTUP", "true").lower() != "false":
+        await run_in_threadpool(sync_beds_on_startup)
+    yield
+    for bus in buses:
+        bus.stop()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="KK Hospital Backend API",
     description="Backend API for KK Hospital",
-    version="4.0.1"
+    version="4.0.1",
+    lifespan=lifespan
 )
 
 
@@ -40,6 +72,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Page cursors, counts and the bed board version travel in headers
+    expose_headers=["X-Next-After", "X-Next-Before", "X-Total-Count", "ETag"],
 )
 
 
@@ -66,6 +100,8 @@ app.include_router(tpa_router, dependencies=[Depends(get_api_key)])
 app.include_router(transaction_router, dependencies=[Depends(get_api_key)])
 app.include_router(bill_router, dependencies=[Depends(get_api_key)])
 app.include_router(insights_router, dependencies=[Depends(get_api_key)])
+# Authenticates with a token from POST /beds/stream/token instead of the header
+app.include_router(bed_stream_router)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,61 @@
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Index, text
 from typing import Optional
+from datetime import datetime
+from sqlalchemy import DateTime
+from models.types import DateString
 
 class BedDetails(SQLModel, table=True):
+    # A UHID can hold at most one occupied bed; enforced even when two requests race
+    __table_args__ = (
+        Index(
+            "uq_beddetails_occupied_uhid", "uhid", unique=True,
+            postgresql_where=text("status = 'occupied'"),
+            sqlite_where=text("status = 'occupied'"),
+        ),
+    )
+
     bed_id: Optional[int] = Field(default=None, primary_key=True)
     uhid: Optional[str] = Field(default=None, index=True)  # No relationship
     patient_name: str
     department: str
     bed_number: str = Field(unique=True)
-    status: str = Field(default="available")  # Tracks "available" or "occupied"
\ No newline at end of file
+    status: str = Field(default="available")  # Tracks "available" or "occupied"
+    # Open bed_event segment of the current occupant, kept by services.bed_events
+    occupied_since: Optional[datetime] = Field(default=None, sa_type=DateTime)
+    admitted_at: Optional[datetime] = Field(default=None, sa_type=DateTime)  # start of the stay, carried across shifts
+
+class BedBoardVersion(SQLModel, table=True):
+    """Single-row counter bumped by every bed change; used as the bed board ETag."""
+    __tablename__ = "bed_board_version"
+
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=0)
+
+
+class BedEvent(SQLModel, table=True):
+    """Append-only log of every allotment, release and shift (IST timestamps)."""
+    __tablename__ = "bed_event"
+    __table_args__ = (
+        Index("idx_bed_event_bed_number_id", "bed_number", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    occurred_at: datetime = Field(index=True, sa_type=DateTime)
+    event: str  # allot, release, shift_out or shift_in
+    bed_number: str
+    department: str
+    uhid: Optional[str] = None
+    admitted_at: Optional[datetime] = Field(default=None, sa_type=DateTime)  # start of the patient's stay, carried across shifts
+
+
+class BedDailyStats(SQLModel, table=True):
+    """Per-day, per-department rollup of bed_event used by /insights/beds."""
+    __tablename__ = "bed_daily_stats"
+
+    stat_date: str = Field(primary_key=True, sa_type=DateString)
+    department: str = Field(primary_key=True)
+    admissions: int = Field(default=0)  # allots and shifts in
+    discharges: int = Field(default=0)  # releases
+    occupied_seconds: int = Field(default=0)  # closed occupancy, split across the days it covered
+    stays: int = Field(default=0)  # completed stays ending this day
+    stay_seconds: int = Field(default=0)
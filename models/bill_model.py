@@ -1,9 +1,20 @@
 from typing import Optional
 from decimal import Decimal
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Index, text
 from sqlalchemy import JSON
+from models.types import TIME_FORMAT_24H, DateString, TimeString
 
 class FinalBillSummary(SQLModel, table=True):
+    # A bill number can be reissued only after its active bill is cancelled
+    __table_args__ = (
+        Index(
+            "uq_finalbillsummary_active_bill_no", "final_bill_no", unique=True,
+            postgresql_where=text("status = 'ACTIVE'"),
+            sqlite_where=text("status = 'ACTIVE'"),
+        ),
+        Index("idx_finalbillsummary_visit", "patient_uhid", "patient_regno"),  # bills of one visit
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     final_bill_no: str = Field(index=True)
     patient_uhid: str
@@ -12,10 +23,10 @@ class FinalBillSummary(SQLModel, table=True):
     patient_type: str
     age: str
     gender: str
-    admission_date: str
-    admission_time: str
-    discharge_date: str
-    discharge_time: str
+    admission_date: str = Field(sa_type=DateString)
+    admission_time: str = Field(sa_type=TimeString(TIME_FORMAT_24H))
+    discharge_date: str = Field(sa_type=DateString, index=True)
+    discharge_time: str = Field(sa_type=TimeString(TIME_FORMAT_24H))
     consultant_doctor: str
     empanelment: str
     room_type: str
@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field
+from models.types import DateString
+
+
+class DailyCensus(SQLModel, table=True):
+    """Per-day, per-patient-type rollup maintained alongside the source tables."""
+    __tablename__ = "daily_census"
+
+    census_date: str = Field(primary_key=True, sa_type=DateString)  # YYYY-MM-DD on the wire
+    patient_type: str = Field(primary_key=True)
+    registrations: int = Field(default=0)
+    discharges: int = Field(default=0)
+    cancellations: int = Field(default=0)
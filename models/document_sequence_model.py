@@ -0,0 +1,10 @@
+from sqlmodel import SQLModel, Field
+
+
+class DocumentSequence(SQLModel, table=True):
+    """Last serial handed out per document type and financial year."""
+    __tablename__ = "document_sequence"
+
+    name: str = Field(primary_key=True)  # "transaction_no" or "final_bill_no"
+    period: str = Field(primary_key=True)  # financial year, e.g. "2526" for April 2025 - March 2026
+    last_serial: int = Field(default=0)
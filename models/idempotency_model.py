@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, JSON
+from sqlmodel import SQLModel, Field
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Stored response for a client-supplied Idempotency-Key, kept until expires_at."""
+    __tablename__ = "idempotency_key"
+
+    key: str = Field(primary_key=True)
+    endpoint: str = Field(primary_key=True)  # e.g. "POST /transactions"
+    request_hash: str  # sha256 of the request body; a reused key with a new body is rejected
+    status_code: Optional[int] = None
+    response_body: Optional[dict] = Field(default=None, sa_type=JSON)
+    expires_at: datetime = Field(index=True, sa_type=DateTime)
@@ -1,6 +1,7 @@
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Index
 from typing import Optional, List
 from sqlalchemy import JSON
+from models.types import DateString, TimeString
 
 class PatientDetails(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -9,10 +10,10 @@ class PatientDetails(SQLModel, table=True):
     title: Optional[str] = None
     fullname: str
     sex: Optional[str] = None
-    mobile: Optional[str] = None
-    dateofreg: str
+    mobile: Optional[str] = Field(default=None, index=True)
+    dateofreg: str = Field(sa_type=DateString, index=True)
     regno: Optional[str] = None
-    time: Optional[str] = None
+    time: Optional[str] = Field(default=None, sa_type=TimeString)
     age: Optional[int] = None
     patient_type: str #type of patient
     empanelment: Optional[str] = None
@@ -24,4 +25,24 @@ class PatientDetails(SQLModel, table=True):
     regAmount: int
     localAddress: Optional[dict] = Field(default=None, sa_type=JSON)
     permanentAddress: Optional[dict] = Field(default=None, sa_type=JSON)
-    registered_by: str
\ No newline at end of file
+    registered_by: str
+
+class PatientCurrentVisit(SQLModel, table=True):
+    """Points each UHID at the PatientDetails row of its latest registration."""
+    __tablename__ = "patient_current_visit"
+
+    uhid: str = Field(primary_key=True)
+    patient_id: int = Field(foreign_key="patientdetails.id")
+
+
+class PatientDoctor(SQLModel, table=True):
+    """One row per doctor in charge of a registration (normalised doctorIncharge)."""
+    __tablename__ = "patient_doctor"
+    __table_args__ = (
+        Index("idx_patient_doctor_doctor_date", "doctor", "dateofreg"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    patient_id: int = Field(foreign_key="patientdetails.id", index=True)
+    doctor: str
+    dateofreg: str = Field(sa_type=DateString)
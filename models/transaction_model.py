@@ -2,6 +2,7 @@ from sqlmodel import SQLModel, Field, JSON, Index
 from typing import Optional
 from decimal import Decimal
 from enum import Enum
+from models.types import TIME_FORMAT_24H, DateString, TimeString
 
 
 class TransactionStatus(str, Enum):
@@ -14,7 +15,7 @@ class TransactionSummary(SQLModel, table=True):
     __table_args__ = (
         Index("idx_patient_visit", "patient_uhid", "patient_regno"),
         Index("idx_transaction_no", "transaction_no", unique=True),
-        Index("idx_transaction_date", "transaction_date"),
+        Index("idx_transaction_date", "transaction_date", "id"),  # keyset order of GET /transactions
         Index("idx_status", "status"),
     )
 
@@ -22,13 +23,13 @@ class TransactionSummary(SQLModel, table=True):
     patient_uhid: str = Field(index=True)
     patient_regno: str = Field(index=True)
     patient_name: str
-    admission_date: str
+    admission_date: str = Field(sa_type=DateString)
     transaction_purpose: str
     amount: Optional[Decimal] = Field(default=None, decimal_places=2)
     payment_mode: str
     payment_details: Optional[dict] = Field(default=None, sa_type=JSON)
-    transaction_date: str
-    transaction_time: str
+    transaction_date: str = Field(sa_type=DateString)
+    transaction_time: str = Field(sa_type=TimeString(TIME_FORMAT_24H))
     transaction_no: str = Field(unique=True)
     created_by: str
 
@@ -0,0 +1,57 @@
+"""Column types that store native DATE/TIME values but keep the API's string format.
+
+Handlers and schemas keep passing "YYYY-MM-DD" dates and the time format each
+column always had on the wire: "%I:%M:%S %p" for registrations, 24-hour
+"%H:%M:%S" for transactions and bills.
+The database stores real DATE and TIME values, so range filters can use
+indexes and ordering is chronological. Bound parameters in comparisons are
+converted too, e.g. `PatientDetails.dateofreg >= "2025-08-01"`.
+"""
+from datetime import date, datetime, time
+from sqlalchemy.types import Date, Time, TypeDecorator
+
+
+DATE_FORMAT = "%Y-%m-%d"
+TIME_FORMAT = "%I:%M:%S %p"
+TIME_FORMAT_24H = "%H:%M:%S"
+ACCEPTED_TIME_FORMATS = ("%I:%M:%S %p", "%H:%M:%S", "%I:%M %p", "%H:%M")
+
+
+def parse_time(value: str) -> time:
+    for fmt in ACCEPTED_TIME_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised time {value!r}")
+
+
+class DateString(TypeDecorator):
+    impl = Date
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, date):
+            return value
+        return datetime.strptime(value.strip(), DATE_FORMAT).date()
+
+    def process_result_value(self, value, dialect):
+        return value.strftime(DATE_FORMAT) if value is not None else None
+
+
+class TimeString(TypeDecorator):
+    """Any accepted time in, `fmt` out."""
+    impl = Time
+    cache_ok = True
+
+    def __init__(self, fmt: str = TIME_FORMAT):
+        super().__init__()
+        self.fmt = fmt
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, time):
+            return value
+        return parse_time(value)
+
+    def process_result_value(self, value, dialect):
+        return value.strftime(self.fmt) if value is not None else None
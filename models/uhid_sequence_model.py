@@ -0,0 +1,9 @@
+from sqlmodel import SQLModel, Field
+
+
+class UhidSequence(SQLModel, table=True):
+    """Last UHID serial handed out for each YYMM period."""
+    __tablename__ = "uhid_sequence"
+
+    period: str = Field(primary_key=True)  # YYMM prefix of the UHID
+    last_serial: int = Field(default=0)
@@ -1,117 +1,26 @@
+import asyncio
+from contextlib import contextmanager
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, text
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, and_, or_, select, text
 from models.bed_model import BedDetails
-from models.patient_model import PatientDetails
-from schemas.bed_schemas import BedDetailsResponseSchema, BedDetailsCreateSchema
+from schemas.bed_schemas import BedBatchRequest, BedDetailsResponseSchema, BedDetailsCreateSchema
 from database import engine
 from schemas.patient_schemas import PatientDetailsResponseSchema
-import models.patient_model as patient_model
+from services.patient_cache import get_cached_latest_visit
+from services.bed_board import bed_board, publish_bed_event, record_bed_change
+from services.bed_stream import broadcaster, format_sse
+from services.stream_tokens import STREAM_TOKEN_TTL, issue_stream_token, verify_stream_token
+from services.bed_events import record_allot, record_moves, record_release, record_shift
 
 
 router = APIRouter(tags=["Bed"])
-
-# Create tables and initialize beds
-def create_db_and_tables():
-    BedDetails.__table__.create(engine, checkfirst=True)  # ensure table exists
-
-    # Define departments and beds
-    departments = [
-        {
-            "name": "Emergency - ground floor",
-            "beds": ["E-1", "E-2", "E-3", "E-4", "E-5", "E-6", "E-7", "E-8", "E-9"]
-        },
-        {
-            "name": "ICU - 3rd Floor",
-            "beds": ["ICU-1", "ICU-2", "ICU-3", "ICU-4", "ICU-5", "ICU-6", "ICU-7", "ICU-8", "ICU-9"]
-        },
-        {
-            "name": "NICU - 2nd Floor",
-            "beds": ["NICU-1", "NICU-2", "NICU-3", "NICU-4", "NICU-5", "NICU-6", "NICU-7", "NICU-8"]
-        },
-        {
-            "name": "HDU - 3rd Floor",
-            "beds": ["HDU-301", "HDU-302", "HDU-303", "HDU-304", "HDU-305", "HDU-306", "HDU-307", "HDU-308"]
-        },
-        {
-            "name": "HDU2 - 3rd Floor",
-            "beds": ["HDU-314", "HDU-315", "HDU-316", "HDU-317"]
-        },
-        {
-            "name": "Dialysis - Ground Floor",
-            "beds": ["D-1", "D-2", "D-3", "D-4", "D-5"]
-        },
-        {
-            "name": "Male Ward - Lower Ground Floor",
-            "beds": ["MW-9", "MW-10", "MW-11", "MW-12", "MW-13", "MW-14", "MW-15", "MW-16", "MW-17"]
-        },
-        {
-            "name": "Female Ward - Lower Ground Floor",
-            "beds": ["FW-1", "FW-2", "FW-3", "FW-4", "FW-5", "FW-6", "FW-7", "FW-8"]
-        },
-        {
-            "name": "General Ward - 2nd Floor",
-            "beds": ["GW-206", "GW-207", "GW-208", "GW-209", "GW-210"]
-        },
-        {
-            "name": "General Ward 2 - 2nd Floor",
-            "beds": ["GW-220", "GW-221", "GW-222", "GW-223"]
-        },
-        {
-            "name": "Post-Op - 3rd Floor",
-            "beds": ["PO-309", "PO-310", "PO-311", "PO-312", "PO-313"]
-        },
-        {
-            "name": "Private - 1st Floor",
-            "beds": ["P1-102", "P1-103", "P1-104","P1-105 (Delux Room)","P1-106 (Reserved) (Delux Room)", "P1-107", "P1-108", "P1-109", "P1-110"]
-        },
-        {
-            "name": "Semi-Private - 1st Floor",
-            "beds": ["SP1-111 A", "SP1-111 B", "SP1-112 A", "SP1-112 B", "SP1-113 A", "SP1-113 B"]
-        },
-        {
-            "name": "Semi-Private - 2nd Floor",
-            "beds": [
-                "SP2-201 A", "SP2-201 B", "SP2-202 A", "SP2-202 B",
-                "SP2-205 A", "SP2-205 B", "SP2-211 A", "SP2-211 B", "SP2-212 A", "SP2-212 B",
-                "SP2-213 A", "SP2-213 B", "SP2-214 A", "SP2-214 B", "SP2-215 A", "SP2-215 B",
-                "SP2-216 A", "SP2-216 B"
-            ]
-        },
-        {
-            "name": "Private - 2nd Floor",
-            "beds": [  "P2-203 (Chemo Ward)", "P2-204", "P2-217 (Delux Room)", "P2-218 (Chemo Ward with Delux)", "P2-219 (Delux Room)"]
-        },
-        {
-            "name": "Isolation - 3rd Floor",
-            "beds": ["ISO-318"]
-        },
-	{
-            "name": "Isolation2 - 3rd Floor",
-            "beds": ["ISO-319"]
-        }
-    ]
-
-
-    # Add only new beds without affecting existing beds
-    with Session(engine) as session:
-        for dept in departments:
-            for bed_number in dept["beds"]:
-                existing_bed = session.exec(
-                    select(BedDetails).where(BedDetails.bed_number == bed_number)
-                ).first()
-                if not existing_bed:
-                    new_bed = BedDetails(
-                        department=dept["name"],
-                        bed_number=bed_number,
-                        patient_name="",
-                        uhid=None,
-                        status="available"
-                    )
-                    session.add(new_bed)
-        session.commit()
-
-create_db_and_tables()
+# Included without the API key dependency: EventSource cannot send headers,
+# so /beds/stream checks a short-lived query token instead
+stream_router = APIRouter(tags=["Bed"])
 
 
 # Get a session
@@ -121,9 +30,36 @@ def get_session():
 
 
 
+def lock_beds(db: Session, *conditions) -> list[BedDetails]:
+    """SELECT ... FOR UPDATE the matching beds, always in bed_id order.
+
+    Only the rows being changed are locked, and the fixed order means two
+    requests touching the same pair of beds cannot deadlock. Postgres re-checks
+    the conditions after waiting, so a bed taken meanwhile drops out.
+    """
+    return list(db.exec(
+        select(BedDetails).where(*conditions).order_by(BedDetails.bed_id).with_for_update()
+    ).all())
+
+
+@contextmanager
+def occupied_uhid_guard(db: Session, detail: str):
+    """Wrap the flushes and commit of an allot or shift.
+
+    If another request gave this UHID a bed first, uq_beddetails_occupied_uhid
+    fails the write and the client gets a 409 with the given detail.
+    """
+    try:
+        yield
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
 @router.post('/bed_allotment', response_model=BedDetailsResponseSchema)
 def create_bed(req: BedDetailsCreateSchema, db: Session = Depends(get_session)):
-    bed = db.exec(select(BedDetails).where(BedDetails.bed_number == req.bed_number)).first()
+    beds = lock_beds(db, BedDetails.bed_number == req.bed_number)
+    bed = beds[0] if beds else None
     dept = db.exec(select(BedDetails).where(BedDetails.department == req.department)).first()
     uhidF= db.exec(select(BedDetails).where(BedDetails.uhid == req.uhid)).first()
 
@@ -145,76 +81,152 @@ def create_bed(req: BedDetailsCreateSchema, db: Session = Depends(get_session)):
     bed.department = req.department
     bed.status = "occupied"  # Automatically set to occupied
     db.add(bed)
-    db.commit()
+    with occupied_uhid_guard(db, f"UHID {req.uhid} already has an occupied bed"):
+        record_allot(db, bed)
+        event = record_bed_change(db, "allot", [bed])
+        db.commit()
+    publish_bed_event(event)
     db.refresh(bed)
     return bed
 
 
 
-@router.get('/beds', response_model=dict)
-def get_all_beds(db: Session = Depends(get_session)):
-    beds = db.exec(select(BedDetails)).all()
-    
-    # Convert to response schema
-    bed_list = [BedDetailsResponseSchema.model_validate(bed) for bed in beds]
-    
-    # Count allotted (occupied) beds
-    total_allotted = db.exec(
-        select(BedDetails).where(BedDetails.status == "occupied")
-    ).all()
-    total_allotted_count = len(total_allotted)
+def count_by_department(beds: list[dict]) -> dict:
+    """Occupied/available/total per department, in the order beds are given."""
+    counts = {}
+    for bed in beds:
+        dept = counts.setdefault(bed["department"], {"occupied": 0, "available": 0, "total": 0})
+        dept["occupied" if bed["status"] == "occupied" else "available"] += 1
+        dept["total"] += 1
+    return counts
+
 
+def build_all_beds(beds: list[dict]) -> dict:
+    departments = count_by_department(beds)
     return {
-        "total_allotted": total_allotted_count,
-        "beds": bed_list
+        "total_allotted": sum(dept["occupied"] for dept in departments.values()),
+        "departments": departments,
+        "beds": beds
     }
 
 
+def build_available_beds(beds: list[dict]) -> dict:
+    available_beds = {}
+    for bed in beds:
+        dept_beds = available_beds.setdefault(bed["department"], [])
+        if bed["status"] == "available":
+            dept_beds.append(bed["bed_number"])
+    return {"available_beds": available_beds, "departments": count_by_department(beds)}
+
+
+def bed_board_response(request: Request, db: Session, name: str, build) -> Response:
+    """Serve a view of the in-memory bed board; 304 when the client already has this version."""
+    version, body = bed_board.view(db, name, build)
+    etag = f'"{version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(content=body, headers={"ETag": etag})
+
+
+@router.get('/beds', response_model=dict)
+def get_all_beds(request: Request, db: Session = Depends(get_session)):
+    return bed_board_response(request, db, "beds", build_all_beds)
 
 
 
 @router.get('/beds/available', response_model=dict)
-def get_available_beds(db: Session = Depends(get_session)):
-    departments = [
-    "Emergency - ground floor",
-    "ICU - 3rd Floor",
-    "NICU - 2nd Floor",
-    "HDU - 3rd Floor",
-    "HDU2 - 3rd Floor",
-    "Dialysis - Ground Floor",
-    "Male Ward - Lower Ground Floor",
-    "Female Ward - Lower Ground Floor",
-    "General Ward - 2nd Floor",
-    "General Ward 2 - 2nd Floor",
-    "Post-Op - 3rd Floor",
-    "Private - 1st Floor",
-    "Semi-Private - 1st Floor",
-    "Semi-Private - 2nd Floor",
-    "Private - 2nd Floor",
-    "Isolation - 3rd Floor",
-    "Isolation2 - 3rd Floor"
-];
-    available_beds = {}
-    for dept in departments:
-        beds = db.exec(
-            select(BedDetails).where(BedDetails.department == dept, BedDetails.status == "available")
-        ).all()
-        available_beds[dept] = [bed.bed_number for bed in beds]
-    return {"available_beds": available_beds}
+def get_available_beds(request: Request, db: Session = Depends(get_session)):
+    return bed_board_response(request, db, "available", build_available_beds)
+
+
+# Seconds between keep-alive comments on idle /beds/stream connections
+STREAM_HEARTBEAT = 15.0
+
+
+def load_bed_board():
+    with Session(engine) as session:
+        return bed_board.snapshot(session)
+
+
+@router.post('/beds/stream/token', response_model=dict)
+def create_stream_token():
+    """Token for opening /beds/stream?token=... from a browser EventSource.
+
+    It is only checked when the stream opens. Fetch a new one before
+    reconnecting once it has expired, because EventSource gives up after a 403.
+    """
+    return {"token": issue_stream_token(), "expires_in": STREAM_TOKEN_TTL}
+
+
+@stream_router.get('/beds/stream')
+async def stream_beds(
+    request: Request,
+    token: str = Query(..., description="Token from POST /beds/stream/token"),
+):
+    """Push allotment, release and shift events as Server-Sent Events.
+
+    The first frame is a "snapshot" of every bed unless Last-Event-ID already
+    matches the current version. Every later frame carries the new board version
+    as its id. After a version gap or a "resync" event a fresh snapshot is sent.
+    """
+    if not verify_stream_token(token):
+        raise HTTPException(status_code=403, detail="Forbidden: Invalid or expired stream token")
+
+    last_event_id = request.headers.get("last-event-id")
+
+    async def events():
+        # Subscribe before reading the snapshot so no event falls in between
+        queue = broadcaster.subscribe()
+        try:
+            version, beds = await run_in_threadpool(load_bed_board)
+            if last_event_id != str(version):
+                yield format_sse("snapshot", version, {"version": version, "beds": beds})
+
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if message["version"] is not None and message["version"] <= version:
+                    continue  # already part of what the client has
+                if message["version"] is None or message["version"] > version + 1:
+                    version, beds = await run_in_threadpool(load_bed_board)
+                    yield format_sse("snapshot", version, {"version": version, "beds": beds})
+                    continue
+
+                version = message["version"]
+                yield format_sse(message["event"], version, message)
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.patch('/bed/{bed_number}')
 def delete_bed(bed_number: str, db: Session = Depends(get_session)):
-    bed = db.exec(select(BedDetails).where(BedDetails.bed_number == bed_number)).first()
+    beds = lock_beds(db, BedDetails.bed_number == bed_number)
+    bed = beds[0] if beds else None
     if not bed:
         raise HTTPException(status_code=404, detail=f"Bed {bed_number} not found")
 
+    was_occupied, uhid = bed.status == "occupied", bed.uhid
+
     # Reset bed to available instead of deleting
     bed.uhid = None
     bed.patient_name = ""
     bed.status = "available"
     db.add(bed)
+    if was_occupied:
+        record_release(db, bed, uhid)
+    event = record_bed_change(db, "release", [bed])
     db.commit()
+    publish_bed_event(event)
     return {"message": f"Bed {bed_number} reset and marked as available"}
 
 # @router.delete('/bed/{bed_number}')
@@ -242,11 +254,19 @@ def shift_bed(req: BedDetailsCreateSchema, db: Session = Depends(get_session)):
     # Find the source bed (where patient is currently, identified by uhid)
     if not req.uhid:
         raise HTTPException(status_code=400, detail="UHID is required to identify the source bed")
-    source_bed = db.exec(select(BedDetails).where(BedDetails.uhid == req.uhid, BedDetails.status == "occupied")).first()
+    # Lock the source and target rows together so no one else can take either
+    beds = lock_beds(
+        db,
+        or_(
+            BedDetails.bed_number == req.bed_number,
+            and_(BedDetails.uhid == req.uhid, BedDetails.status == "occupied"),
+        ),
+    )
+    source_bed = next((bed for bed in beds if bed.uhid == req.uhid and bed.status == "occupied"), None)
     if not source_bed:
         raise HTTPException(status_code=404, detail=f"No occupied bed found for UHID {req.uhid}")
     # Find the target bed (new bed_number)
-    target_bed = db.exec(select(BedDetails).where(BedDetails.bed_number == req.bed_number)).first()
+    target_bed = next((bed for bed in beds if bed.bed_number == req.bed_number), None)
     if not target_bed:
         raise HTTPException(status_code=404, detail=f"Target bed {req.bed_number} not found")
     if target_bed.status == "occupied":
@@ -256,28 +276,119 @@ def shift_bed(req: BedDetailsCreateSchema, db: Session = Depends(get_session)):
     source_bed.patient_name = ""
     source_bed.status = "available"
     db.add(source_bed)
+    # Free the UHID before the target row is written, or the unique index trips
+    db.flush()
     # Update target bed to occupied with new details
     target_bed.uhid = req.uhid
     target_bed.patient_name = req.patient_name
     target_bed.department = req.department
     target_bed.status = "occupied"
     db.add(target_bed)
-    db.commit()
+    with occupied_uhid_guard(db, f"UHID {req.uhid} already has an occupied bed"):
+        record_shift(db, source_bed, target_bed, req.uhid)
+        event = record_bed_change(db, "shift", [source_bed, target_bed])
+        db.commit()
+    publish_bed_event(event)
     db.refresh(target_bed)
     return target_bed
 
 
 
+@router.post('/beds/batch', response_model=List[BedDetailsResponseSchema])
+def batch_beds(req: BedBatchRequest, db: Session = Depends(get_session)):
+    """Apply allot, release and shift operations together in one commit.
+
+    Operations run in order against the batch's working state. A bed may hold
+    two patients mid-batch, so two occupied beds can be swapped with two shifts,
+    but every bed must hold at most one patient once the batch ends. Any failure
+    rejects the whole batch. Returns every changed bed in its final state.
+    """
+    ops = req.operations
+    uhids = {op.uhid for op in ops if op.uhid}
+    # One FOR UPDATE over every named bed and every bed these UHIDs occupy (bed_id order)
+    locked = lock_beds(
+        db,
+        or_(
+            BedDetails.bed_number.in_({op.bed_number for op in ops}),
+            and_(BedDetails.uhid.in_(uhids), BedDetails.status == "occupied"),
+        ),
+    )
+    beds = {bed.bed_number: bed for bed in locked}
+    names = {bed.uhid: bed.patient_name for bed in locked if bed.status == "occupied"}
+    initial = {bed.uhid: bed.bed_number for bed in locked if bed.status == "occupied"}
+    where = dict(initial)
+    occupants = {number: [bed.uhid] if bed.status == "occupied" else [] for number, bed in beds.items()}
+
+    for i, op in enumerate(ops):
+        if op.bed_number not in beds:
+            raise HTTPException(status_code=404, detail=f"operations[{i}]: Bed {op.bed_number} not found")
+        if op.op == "release":
+            if not occupants[op.bed_number]:
+                raise HTTPException(status_code=400, detail=f"operations[{i}]: Bed {op.bed_number} is not occupied")
+            for uhid in occupants[op.bed_number]:
+                del where[uhid]
+            occupants[op.bed_number] = []
+            continue
+        if op.op == "allot":
+            if op.uhid in where:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"operations[{i}]: Bed is alredy alloted to UHID {op.uhid}"
+                )
+            names[op.uhid] = op.patient_name
+        else:
+            if op.uhid not in where:
+                raise HTTPException(status_code=404, detail=f"operations[{i}]: No occupied bed found for UHID {op.uhid}")
+            occupants[where[op.uhid]].remove(op.uhid)
+        occupants[op.bed_number].append(op.uhid)
+        where[op.uhid] = op.bed_number
+
+    for number, held in occupants.items():
+        if len(held) > 1:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Bed {number} would end up occupied by UHIDs {', '.join(held)}"
+            )
+
+    moves = [
+        (uhid, beds.get(initial.get(uhid)), beds.get(where.get(uhid)))
+        for uhid in sorted(set(initial) | set(where))
+        if initial.get(uhid) != where.get(uhid)
+    ]
+    changed = {bed.bed_number: bed for _, source, target in moves for bed in (source, target) if bed}
+    changed = [changed[number] for number in sorted(changed, key=lambda n: beds[n].bed_id)]
+    if not changed:
+        return []
+
+    with occupied_uhid_guard(db, "A UHID in this batch already has an occupied bed"):
+        # Vacate first so a swap never holds one UHID in two occupied rows
+        for bed in changed:
+            bed.uhid = None
+            bed.patient_name = ""
+            bed.status = "available"
+            db.add(bed)
+        db.flush()
+        for uhid, _, target in moves:
+            if target:
+                target.uhid = uhid
+                target.patient_name = names[uhid]
+                target.status = "occupied"
+                db.add(target)
+        record_moves(db, moves)
+        event = record_bed_change(db, "batch", changed)
+        db.commit()
+    publish_bed_event(event)
+    for bed in changed:
+        db.refresh(bed)
+    return changed
+
+
+
 @router.get('/beds/patient/{uhid}', response_model=PatientDetailsResponseSchema)
 def get_patient_by_uhid_for_bed(uhid: str, db: Session = Depends(get_session)):
 
     # Step 1: Get latest registration for this UHID
-    latest_patient = db.exec(
-        select(patient_model.PatientDetails)
-        .where(patient_model.PatientDetails.uhid == uhid)  # fixed here
-        .order_by(patient_model.PatientDetails.regno.desc())  # latest regno
-        .limit(1)
-    ).first()
+    latest_patient = get_cached_latest_visit(db, uhid)
 
     if not latest_patient:
         raise HTTPException(status_code=404, detail=f"No registration found for UHID {uhid}")
@@ -288,17 +399,7 @@ def get_patient_by_uhid_for_bed(uhid: str, db: Session = Depends(get_session)):
             detail=f"UHID {uhid} is not registered as IPD Or DAYCARE (found {latest_patient.patient_type})"
         )
 
-    # Step 2: Get the most recent record
-    patient = db.exec(
-        select(PatientDetails)
-        .where(PatientDetails.uhid == uhid)
-        .order_by(PatientDetails.regno.desc())
-    ).first()
-    
-    if not patient:
-        raise HTTPException(status_code=404, detail=f"No patient found for UHID {uhid}")
-
-    return patient
+    return latest_patient
 
 
 
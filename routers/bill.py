@@ -1,30 +1,20 @@
 from decimal import Decimal
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends, status
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, status
 from sqlmodel import Session, desc, select
-from database import engine
+from database import engine, on_conflict_insert
 from models.bill_model import FinalBillSummary
 from schemas.bill_schema import FinalBillSummaryCreate, PatientDetailsShowSchemaForBill, BedDetailsShowSchemaForBill, AllTransactionSummaryShowSchemaForBill, FinalBillSummaryShowSchema, UpdateBillSchema
 from models.bed_model import BedDetails
-from models.patient_model import PatientDetails
 from models.transaction_model import TransactionSummary
-from models import bill_model
+from services.census import bump_census
+from services.document_numbers import is_server_number, issue_number
+from services.idempotency import start_idempotent_request, store_response
+from services.patient_cache import get_cached_latest_visit
 
 
 router= APIRouter(tags=['Bills'])
 
-def create_db_and_tables():
-
-    # with engine.connect() as conn:
-    #     conn.execute(text("DROP TABLE IF EXISTS finalbillsummary CASCADE"))
-    #     conn.commit()
-        
-    # bill_model.FinalBillSummary.__table__.drop(engine, checkfirst=True)
-    bill_model.FinalBillSummary.__table__.create(engine, checkfirst=True)
-
-create_db_and_tables()
-
-
 # Get a session
 def get_session():
     with Session(engine) as session:
@@ -44,25 +34,30 @@ def prepare_json_for_db(data):
     return data
 
 
-@router.post("/final-bill", response_model=FinalBillSummaryShowSchema)
-def create_final_bill(req: FinalBillSummaryCreate, db: Session = Depends(get_session)):
+CREATE_FINAL_BILL = "POST /final-bill"
 
-    existing_bill = db.exec(
-    select(FinalBillSummary)
-    .where(FinalBillSummary.final_bill_no == req.final_bill_no)
-    .order_by(
-        desc(FinalBillSummary.id)
-    )
-    ).first()
 
-    # print(existing_bill)
+@router.post("/final-bill", response_model=FinalBillSummaryShowSchema)
+def create_final_bill(
+    req: FinalBillSummaryCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_session)
+):
 
-    if existing_bill and existing_bill.status=='ACTIVE':
+    if req.final_bill_no and is_server_number("final_bill_no", req.final_bill_no):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Final bill already exists for UHID {req.patient_uhid}"
+            status_code=400,
+            detail="Final bill numbers in this format are issued by the server; omit final_bill_no"
         )
-    
+
+    if idempotency_key:
+        replayed = start_idempotent_request(db, idempotency_key, CREATE_FINAL_BILL, req)
+        if replayed:
+            return replayed
+
+    # Drawn only once this request will insert, so replays leave no gaps
+    final_bill_no = req.final_bill_no or issue_number(db, "final_bill_no")
+
     charges = prepare_json_for_db([item.model_dump() for item in req.charges_summary]) if req.charges_summary else None
 
     txns = prepare_json_for_db([item.model_dump() for item in req.transaction_breakdown]) if req.transaction_breakdown else None
@@ -71,7 +66,7 @@ def create_final_bill(req: FinalBillSummaryCreate, db: Session = Depends(get_ses
     total_discount = prepare_json_for_db(req.total_discount.model_dump()) if req.total_discount else None
 
     new_bill = FinalBillSummary(
-        final_bill_no=req.final_bill_no,
+        final_bill_no=final_bill_no,
         patient_uhid=req.patient_uhid,
         patient_regno=req.patient_regno,
         patient_name=req.patient_name,
@@ -97,7 +92,30 @@ def create_final_bill(req: FinalBillSummaryCreate, db: Session = Depends(get_ses
         created_by=req.created_by
     )
 
-    db.add(new_bill)
+    # uq_finalbillsummary_active_bill_no decides: a cancelled number may be reused
+    new_bill = db.exec(
+        on_conflict_insert(db, FinalBillSummary)
+        .values(**new_bill.model_dump(exclude={"id"}, exclude_none=True))
+        .on_conflict_do_nothing(
+            index_elements=["final_bill_no"],
+            index_where=FinalBillSummary.status == "ACTIVE"
+        )
+        .returning(FinalBillSummary)
+    ).scalars().first()
+
+    if new_bill is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Final bill already exists for UHID {req.patient_uhid}"
+        )
+
+    bump_census(db, new_bill.discharge_date, new_bill.patient_type, discharges=1)
+    if idempotency_key:
+        store_response(
+            db, idempotency_key, CREATE_FINAL_BILL, 200,
+            FinalBillSummaryShowSchema.model_validate(new_bill).model_dump(mode="json")
+        )
     db.commit()
     db.refresh(new_bill)
     return new_bill
@@ -150,6 +168,7 @@ def cancel_transaction(
     bill.cancelled_by = req.cancelled_by
 
     db.add(bill)
+    bump_census(db, bill.discharge_date, bill.patient_type, cancellations=1)
     db.commit()
     db.refresh(bill)
     return bill
@@ -160,12 +179,8 @@ def cancel_transaction(
 
 @router.get('/patient/bed/transaction/{uhid}/forbill', response_model=dict)
 def get_bed_by_uhid(uhid: str, db: Session = Depends(get_session)):
-    # Query PatientDetails by uhid to get the most recent regno
-    patient = db.exec(
-        select(PatientDetails)
-        .where(PatientDetails.uhid == uhid)
-        .order_by(PatientDetails.regno.desc())
-    ).first()
+    # Latest registration (most recent regno) for this UHID
+    patient = get_cached_latest_visit(db, uhid)
 
     if not patient:
         raise HTTPException(status_code=404, detail=f"No patient found with UHID {uhid}")
@@ -1,26 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import insert, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from collections import Counter
 from typing import Optional
+import json
+import re
 from datetime import datetime, timezone
 from sqlmodel import Session, select
 import models.patient_model as patient_model
 import schemas.patient_schemas as patient_schemas
 from database import engine
+from services.census import bump_census
+from services.dates import validate_date_params
+from services.uhid import reserve_uhids
+from services.visits import get_latest_visit, set_current_visit, set_current_visits
+from services.patient_cache import get_patient_cache_stats, invalidate_patient
+from services.name_search import search_patients_by_name
+from services.doctors import add_patient_doctors
 import pytz
 
 
 router = APIRouter(tags=["Patient"])
 
-def create_db_and_tables():
-    
-    # with engine.connect() as conn:
-    #     conn.execute(text("DROP TABLE IF EXISTS patientdetails CASCADE"))
-    #     conn.commit()
-
-    # patient_model.PatientDetails.__table__.drop(engine, checkfirst=True)
-    patient_model.PatientDetails.__table__.create(engine, checkfirst=True)
-
-create_db_and_tables()
-
 def get_session():
     with Session(engine) as session:
         yield session
@@ -39,25 +43,17 @@ def generate_ids(db: Session, existing_uhid: Optional[str] = None) -> tuple:
     if existing_uhid:
         new_uhid = existing_uhid
     else:
-        result = db.exec(select(patient_model.PatientDetails.uhid).order_by(patient_model.PatientDetails.uhid.desc()))
-        last_uhid = result.first()
-        if last_uhid and last_uhid.startswith(time_str):
-            serial_no = int(last_uhid[-4:]) + 1
-        else:
-            serial_no = 1
-        new_uhid = f"{time_str}{serial_no:04d}"
+        new_uhid = reserve_uhids(db, time_str)[0]
 
     new_regno = f"{1:03d}"
     return new_uhid, new_regno
 
-@router.post('/patient', response_model=patient_schemas.PatientDetailsResponseSchema)
-def create_patient(req: patient_schemas.PatientDetailsCreateSchema, db: Session = Depends(get_session)):
-    uhid, regno = generate_ids(db)
+def build_new_patient(req: patient_schemas.PatientDetailsCreateSchema, uhid: str, regno: str) -> patient_model.PatientDetails:
     current_ist_datetime = get_current_ist_time()
     date_of_registration = current_ist_datetime.strftime("%Y-%m-%d")
     time_of_registration = current_ist_datetime.strftime("%I:%M:%S %p")
 
-    new_patient = patient_model.PatientDetails(
+    return patient_model.PatientDetails(
         uhid=uhid,
         adhaar_no=req.adhaar_no,
         title=req.title,
@@ -80,11 +76,139 @@ def create_patient(req: patient_schemas.PatientDetailsCreateSchema, db: Session
         permanentAddress=req.permanentAddress.model_dump() if req.permanentAddress else None,
         registered_by=req.registered_by
     )
+
+@router.post('/patient', response_model=patient_schemas.PatientDetailsResponseSchema)
+def create_patient(req: patient_schemas.PatientDetailsCreateSchema, db: Session = Depends(get_session)):
+    uhid, regno = generate_ids(db)
+    new_patient = build_new_patient(req, uhid, regno)
     db.add(new_patient)
+    set_current_visit(db, new_patient)
+    add_patient_doctors(db, [new_patient])
+    bump_census(db, new_patient.dateofreg, new_patient.patient_type, registrations=1)
     db.commit()
     db.refresh(new_patient)
+    invalidate_patient(new_patient.uhid)
     return new_patient
 
+
+BULK_MAX_ROWS = 5000
+BULK_CHUNK_SIZE = 500
+
+
+def parse_bulk_body(body: bytes, content_type: str) -> list:
+    """Return one entry per input row: the decoded object, or a ValueError for a bad line."""
+    try:
+        text_body = body.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=400, detail=f"Body must be UTF-8 encoded: {exc}")
+    if "ndjson" in content_type:
+        rows = []
+        for line in text_body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as exc:
+                rows.append(ValueError(f"Invalid JSON: {exc}"))
+        return rows
+
+    try:
+        rows = json.loads(text_body)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {exc}")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    return rows
+
+
+@router.post('/patient/bulk', response_model=dict)
+async def create_patients_bulk(request: Request):
+    """Register many patients at once from a JSON array or an NDJSON body.
+
+    Rows that fail validation are reported in "errors" and skipped; the rest
+    are registered with UHIDs reserved as one block.
+    """
+    rows = parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    if len(rows) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ROWS} patients per request")
+    return await run_in_threadpool(register_bulk_patients, rows)
+
+
+def insert_patients(db: Session, patients: list):
+    """Insert registrations with their current-visit, doctor and census rows."""
+    inserted = db.connection().execute(
+        insert(patient_model.PatientDetails).returning(
+            patient_model.PatientDetails.id, patient_model.PatientDetails.uhid
+        ),
+        [patient.model_dump(exclude={"id"}) for patient in patients]
+    ).all()
+    set_current_visits(db, [(uhid, patient_id) for patient_id, uhid in inserted])
+    ids_by_uhid = {uhid: patient_id for patient_id, uhid in inserted}
+    for patient in patients:
+        patient.id = ids_by_uhid[patient.uhid]
+    add_patient_doctors(db, patients)
+    census = Counter((p.dateofreg, p.patient_type) for p in patients)
+    for (day, p_type), count in census.items():
+        bump_census(db, day, p_type, registrations=count)
+
+
+def register_bulk_patients(rows: list) -> dict:
+    errors = []
+    valid = []
+    for index, row in enumerate(rows):
+        if isinstance(row, ValueError):
+            errors.append({"row": index, "errors": [str(row)]})
+            continue
+        try:
+            valid.append((index, patient_schemas.PatientDetailsCreateSchema.model_validate(row)))
+        except ValidationError as exc:
+            errors.append({
+                "row": index,
+                "errors": [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()]
+            })
+
+    registered = []
+    if valid:
+        with Session(engine) as db:
+            period = get_current_ist_time().strftime("%y%m")
+            uhids = reserve_uhids(db, period, len(valid))
+            patients = [build_new_patient(req, uhid, f"{1:03d}") for (_, req), uhid in zip(valid, uhids)]
+            indexes = [index for index, _ in valid]
+
+            for start in range(0, len(valid), BULK_CHUNK_SIZE):
+                chunk = list(zip(indexes[start:start + BULK_CHUNK_SIZE], patients[start:start + BULK_CHUNK_SIZE]))
+                try:
+                    with db.begin_nested():
+                        insert_patients(db, [patient for _, patient in chunk])
+                    inserted = chunk
+                except (SQLAlchemyError, ValueError):
+                    # Retry the chunk row by row so one bad row fails alone
+                    # and reports its own error; its UHID is left as a gap
+                    inserted = []
+                    for index, patient in chunk:
+                        try:
+                            with db.begin_nested():
+                                insert_patients(db, [patient])
+                            inserted.append((index, patient))
+                        except (SQLAlchemyError, ValueError) as exc:
+                            errors.append({"row": index, "errors": [f"Database error: {getattr(exc, 'orig', None) or exc}"]})
+
+                registered.extend(
+                    {"row": index, "uhid": patient.uhid, "regno": patient.regno}
+                    for index, patient in inserted
+                )
+            db.commit()
+
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "received": len(rows),
+        "registered": len(registered),
+        "failed": len(errors),
+        "patients": registered,
+        "errors": errors
+    }
+
+
 @router.get('/debug-time')
 def debug_time():
     import os
@@ -98,15 +222,51 @@ def debug_time():
         "system_timezone": str(datetime.now().astimezone().tzinfo)
     }
 
+@router.get('/debug-patient-cache')
+def debug_patient_cache():
+    return get_patient_cache_stats()
+
+
+
+@router.get('/patient/search', response_model=list[patient_schemas.PatientDetailsSearchResponseSchema])
+def search_patients(
+    q: str = Query(..., min_length=2, description="Name or father/husband name, prefix or approximate"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_session)
+):
+    # Registered before /patient/{search_value} so "search" is not taken as a UHID
+    return search_patients_by_name(db, q, limit)
+
+
+# Identifier column implied by the number of digits in the search value
+IDENTIFIER_COLUMNS = {
+    8: patient_model.PatientDetails.uhid,
+    10: patient_model.PatientDetails.mobile,
+    12: patient_model.PatientDetails.adhaar_no,
+}
+
 
 @router.get('/patient/{search_value}', response_model=list[patient_schemas.PatientDetailsSearchResponseSchema])
 def get_patient_by_uhid_or_mobile_or_adhaar(search_value: str, db: Session = Depends(get_session)):
-    # Build query to search by uhid or mobile
-    query = select(patient_model.PatientDetails).where(
-        (patient_model.PatientDetails.uhid == search_value) |
-        (patient_model.PatientDetails.mobile == search_value) |
-        (patient_model.PatientDetails.adhaar_no == search_value)
-    )
+    # Mobile and Aadhaar are stored as bare digits, so ignore spaces and dashes
+    value = re.sub(r'[\s-]', '', search_value)
+    if not value.isdigit():
+        value = search_value
+
+    column = IDENTIFIER_COLUMNS.get(len(value)) if value.isdigit() else None
+    if column is not None:
+        # Unambiguous: a single lookup on one indexed column
+        query = select(patient_model.PatientDetails).where(column == value)
+    else:
+        # Ambiguous: one index lookup per column instead of an OR the planner may scan for
+        matches = union_all(*(
+            select(patient_model.PatientDetails.id).where(column == value)
+            for column in IDENTIFIER_COLUMNS.values()
+        )).subquery()
+        query = select(patient_model.PatientDetails).join(
+            matches, matches.c.id == patient_model.PatientDetails.id
+        )
+
     result = db.exec(query.order_by(patient_model.PatientDetails.regno.desc()))
     patients = result.all()
     if not patients:
@@ -117,8 +277,7 @@ def get_patient_by_uhid_or_mobile_or_adhaar(search_value: str, db: Session = Dep
 
 @router.put('/patient/{uhid}', response_model=patient_schemas.PatientDetailsResponseSchema)
 def update_patient_by_uhid(uhid: str, req: patient_schemas.PatientDetailsUpdateSchema, db: Session = Depends        (get_session)):
-    result = db.exec(select(patient_model.PatientDetails).where(patient_model.PatientDetails.uhid == uhid).order_by(patient_model.PatientDetails.regno.desc()))
-    existing_patient = result.first()
+    existing_patient = get_latest_visit(db, uhid)
     if not existing_patient:
         raise HTTPException(status_code=404, detail=f"Patient with UHID {uhid} not found")
 
@@ -151,8 +310,12 @@ def update_patient_by_uhid(uhid: str, req: patient_schemas.PatientDetailsUpdateS
     )
     
     db.add(new_patient)
+    set_current_visit(db, new_patient)
+    add_patient_doctors(db, [new_patient])
+    bump_census(db, new_patient.dateofreg, new_patient.patient_type, registrations=1)
     db.commit()
     db.refresh(new_patient)
+    invalidate_patient(new_patient.uhid)
     return new_patient
 
 
@@ -165,12 +328,7 @@ def update_patient_type(
     db: Session = Depends(get_session)
 ):
     # Step 1: Get latest registration for this UHID
-    latest_patient = db.exec(
-        select(patient_model.PatientDetails)
-        .where(patient_model.PatientDetails.uhid == uhid)
-        .order_by(patient_model.PatientDetails.regno.desc())  # latest regno
-        .limit(1)
-    ).first()
+    latest_patient = get_latest_visit(db, uhid)
 
     if not latest_patient:
         raise HTTPException(status_code=404, detail=f"No patient found with UHID {uhid}")
@@ -181,8 +339,12 @@ def update_patient_type(
     # Step 3: Update patient_type with validated value from schema
     latest_patient.patient_type = req.patient_type
     db.add(latest_patient)
+    if old_type != latest_patient.patient_type:
+        bump_census(db, latest_patient.dateofreg, old_type, registrations=-1)
+        bump_census(db, latest_patient.dateofreg, latest_patient.patient_type, registrations=1)
     db.commit()
     db.refresh(latest_patient)
+    invalidate_patient(uhid)
 
     # Step 4: Return summary
     return {
@@ -197,13 +359,46 @@ def update_patient_type(
 
 
 
-@router.get('/patient', response_model=list[patient_schemas.PatientDetailsSearchResponseSchema])
-def get_all_patients(db: Session = Depends(get_session)):
-    result = db.exec(select(patient_model.PatientDetails))
-    return result.all()
-
-
-
-
+# Rows fetched per round trip when streaming from a server-side cursor
+STREAM_CHUNK_SIZE = 500
 
 
+@router.get('/patient', response_model=list[patient_schemas.PatientDetailsSearchResponseSchema])
+def get_all_patients(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[int] = Query(None, description="Return rows with id greater than this cursor"),
+    date_from: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    date_to: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    patient_type: Optional[str] = Query(None),
+    stream: bool = Query(False, description="Stream every matching row as NDJSON instead of one page"),
+    db: Session = Depends(get_session)
+):
+    validate_date_params(date_from=date_from, date_to=date_to)
+    query = select(patient_model.PatientDetails)
+    if after is not None:
+        query = query.where(patient_model.PatientDetails.id > after)
+    if date_from:
+        query = query.where(patient_model.PatientDetails.dateofreg >= date_from)
+    if date_to:
+        query = query.where(patient_model.PatientDetails.dateofreg <= date_to)
+    if patient_type:
+        query = query.where(patient_model.PatientDetails.patient_type == patient_type)
+    query = query.order_by(patient_model.PatientDetails.id)
+
+    if stream:
+        def generate_rows():
+            # Own session: the request-scoped one may be closed while we are still streaming
+            with Session(engine) as stream_db:
+                rows = stream_db.exec(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+                for patient in rows:
+                    item = patient_schemas.PatientDetailsSearchResponseSchema.model_validate(patient)
+                    yield item.model_dump_json() + "\n"
+
+        return StreamingResponse(generate_rows(), media_type="application/x-ndjson")
+
+    patients = db.exec(query.limit(limit)).all()
+    # Cursor for the next page travels in a header so the body stays a plain list
+    if len(patients) == limit:
+        response.headers["X-Next-After"] = str(patients[-1].id)
+    return patients
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Literal, Optional
 from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import literal, union_all
 from sqlmodel import Session, func, select
 import models.patient_model as patient_model
 import schemas.patient_schemas as patient_schemas
 from database import engine
 from models.bill_model import FinalBillSummary
-from models.bed_model import BedDetails
+from models.bed_model import BedDailyStats, BedDetails
+from models.transaction_model import TransactionSummary
+from models.census_model import DailyCensus
+from services.cache import LRUCache
+from services.dates import validate_date_params
+from services.bed_events import COUNTERS as BED_STAT_COUNTERS, ist_now
 
 
 
@@ -19,63 +26,62 @@ def get_session():
 
 
 
-@router.get('/patients/count_and_graph')
-def get_today_patient_counts(db: Session = Depends(get_session)):
-    today_date = datetime.now().strftime("%Y-%m-%d")
+# Trend windows the dashboard can ask for; each costs the same single rollup read.
+GRAPH_WINDOWS = (7, 30, 90, 365)
 
-    # --- Patient counts for today ---
-    patient_types = ["OPD", "IPD", "DAYCARE"]
-    today_counts = {}
-    for p_type in patient_types:
-        query = select(func.count()).where(
-            patient_model.PatientDetails.dateofreg == today_date,
-            patient_model.PatientDetails.patient_type == p_type
-        )
-        count = db.exec(query).one()
-        today_counts[p_type] = count
-
-    # --- Discharge count for today ---
-    discharge_query = select(func.count()).where(
-        FinalBillSummary.discharge_date == today_date
-    )
-    discharge_count = db.exec(discharge_query).one()
 
-    # --- Graph data for last 30 days ---
-    graph = {
-        "OPD": {"dates_x_axis": [], "dates_y_axis": []},
-        "IPD": {"dates_x_axis": [], "dates_y_axis": []},
-        "DAYCARE": {"dates_x_axis": [], "dates_y_axis": []},
-        "DISCHARGED": {"dates_x_axis": [], "dates_y_axis": []}
-    }
+@router.get('/patients/count_and_graph')
+def get_today_patient_counts(
+    days: int = Query(30, description="Graph window in days: 7, 30, 90 or 365"),
+    db: Session = Depends(get_session)
+):
+    if days not in GRAPH_WINDOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"days must be one of: {', '.join(str(d) for d in GRAPH_WINDOWS)}"
+        )
 
-    for i in range(30):
-        day = datetime.now() - timedelta(days=29 - i)  # last 30 days
-        day_str = day.strftime("%Y-%m-%d")
+    now = datetime.now()
+    today_date = now.strftime("%Y-%m-%d")
+    day_strs = [(now - timedelta(days=days - 1 - i)).strftime("%Y-%m-%d") for i in range(days)]
+    start_date = day_strs[0]
 
-        for p_type in patient_types:
-            query = select(func.count()).where(
-                patient_model.PatientDetails.dateofreg == day_str,
-                patient_model.PatientDetails.patient_type == p_type
-            )
-            count = db.exec(query).one()
-            graph[p_type]["dates_x_axis"].append(day_str)
-            graph[p_type]["dates_y_axis"].append(count)
+    patient_types = ["OPD", "IPD", "DAYCARE"]
 
-        # Discharge count for this day
-        discharge_query = select(func.count()).where(
-            FinalBillSummary.discharge_date == day_str
+    # --- One read of the daily_census rollup: at most days x types tiny rows ---
+    census_rows = db.exec(
+        select(DailyCensus).where(
+            DailyCensus.census_date >= start_date,
+            DailyCensus.census_date <= today_date
         )
-        discharge_count_day = db.exec(discharge_query).one()
-        graph["DISCHARGED"]["dates_x_axis"].append(day_str)
-        graph["DISCHARGED"]["dates_y_axis"].append(discharge_count_day)
+    ).all()
+
+    counts = {}
+    discharge_counts = {}
+    for row in census_rows:
+        counts[(row.census_date, row.patient_type)] = row.registrations
+        discharge_counts[row.census_date] = discharge_counts.get(row.census_date, 0) + row.discharges
+
+    # --- Zero-fill the graph for days without any rows ---
+    graph = {
+        p_type: {
+            "dates_x_axis": list(day_strs),
+            "dates_y_axis": [counts.get((day, p_type), 0) for day in day_strs]
+        }
+        for p_type in patient_types
+    }
+    graph["DISCHARGED"] = {
+        "dates_x_axis": list(day_strs),
+        "dates_y_axis": [discharge_counts.get(day, 0) for day in day_strs]
+    }
 
     return {
         "count": {
             "date": today_date,
-            "total_OPD": today_counts["OPD"],
-            "total_IPD": today_counts["IPD"],
-            "total_DAYCARE": today_counts["DAYCARE"],
-            "total_Discharged": discharge_count
+            "total_OPD": counts.get((today_date, "OPD"), 0),
+            "total_IPD": counts.get((today_date, "IPD"), 0),
+            "total_DAYCARE": counts.get((today_date, "DAYCARE"), 0),
+            "total_Discharged": discharge_counts.get(today_date, 0)
         },
         "graph": graph
     }
@@ -85,14 +91,59 @@ def get_today_patient_counts(db: Session = Depends(get_session)):
 
 @router.get("/patients/filter", response_model=list[patient_schemas.PatientFilterSchema])
 def filter_patients(
+    response: Response,
     patient_type: Optional[str] = Query(None),
     date_from: Optional[str] = Query(None),
     date_to: Optional[str] = Query(None),
     doctor_wise: Optional[str] = Query(None),
     empanelment: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    before: Optional[int] = Query(None, description="Return rows with id lower than this cursor"),
     db: Session = Depends(get_session)
 ):
-    # Main query including BedDetails
+    validate_date_params(date_from=date_from, date_to=date_to)
+
+    # Filters shared by the page query and the total count
+    filters = []
+    if patient_type:
+        filters.append(patient_model.PatientDetails.patient_type == patient_type)
+
+    if date_from:
+        filters.append(patient_model.PatientDetails.dateofreg >= date_from)
+
+    if date_to:
+        filters.append(patient_model.PatientDetails.dateofreg <= date_to)
+
+    if doctor_wise and doctor_wise != "All":
+        # Indexed (doctor, dateofreg) lookup on the normalised assignment table
+        doctor_visits = select(patient_model.PatientDoctor.patient_id).where(
+            patient_model.PatientDoctor.doctor == doctor_wise.strip()
+        )
+        if date_from:
+            doctor_visits = doctor_visits.where(patient_model.PatientDoctor.dateofreg >= date_from)
+        if date_to:
+            doctor_visits = doctor_visits.where(patient_model.PatientDoctor.dateofreg <= date_to)
+        filters.append(patient_model.PatientDetails.id.in_(doctor_visits))
+
+    if empanelment:
+        filters.append(patient_model.PatientDetails.empanelment == empanelment)
+
+    # A visit can have several non-cancelled bills; join only the latest so each
+    # patient stays one row and the page agrees with X-Total-Count
+    latest_bill_id = (
+        select(func.max(FinalBillSummary.id))
+        .where(
+            FinalBillSummary.patient_uhid == patient_model.PatientDetails.uhid,
+            FinalBillSummary.patient_regno == patient_model.PatientDetails.regno,
+            FinalBillSummary.status != "CANCELLED"
+        )
+        .correlate(patient_model.PatientDetails)
+        .scalar_subquery()
+    )
+
+    # Main query including BedDetails; a bed is only joined to the latest visit of
+    # each UHID, which the patient_current_visit pointer identifies directly. The
+    # occupied-UHID unique index allows at most one such bed.
     query = (
         select(
             patient_model.PatientDetails,
@@ -101,49 +152,34 @@ def filter_patients(
             BedDetails.department,
             BedDetails.bed_number
         )
+        .outerjoin(FinalBillSummary, FinalBillSummary.id == latest_bill_id)
         .outerjoin(
-            FinalBillSummary,
-            (FinalBillSummary.patient_uhid == patient_model.PatientDetails.uhid) &
-            (FinalBillSummary.patient_regno == patient_model.PatientDetails.regno) &
-            (FinalBillSummary.status != "CANCELLED")
+            patient_model.PatientCurrentVisit,
+            patient_model.PatientCurrentVisit.patient_id == patient_model.PatientDetails.id
         )
         .outerjoin(
             BedDetails,
-            BedDetails.uhid == patient_model.PatientDetails.uhid
+            (BedDetails.uhid == patient_model.PatientDetails.uhid) &
+            (BedDetails.status == "occupied") &
+            (patient_model.PatientCurrentVisit.uhid.is_not(None))
         )
+        .where(*filters)
     )
 
-    if patient_type:
-        query = query.where(patient_model.PatientDetails.patient_type == patient_type)
+    if before is not None:
+        query = query.where(patient_model.PatientDetails.id < before)
 
-    if date_from:
-        query = query.where(patient_model.PatientDetails.dateofreg >= date_from)
-
-    if date_to:
-        query = query.where(patient_model.PatientDetails.dateofreg <= date_to)
-
-    if doctor_wise and doctor_wise != "All":
-        query = query.where(
-            patient_model.PatientDetails.doctorIncharge.ilike(f'%{doctor_wise}%')
-        )
-
-    if empanelment:
-        query = query.where(patient_model.PatientDetails.empanelment == empanelment)
-
-    query = query.order_by(patient_model.PatientDetails.id.desc())
+    query = query.order_by(patient_model.PatientDetails.id.desc()).limit(limit)
 
     result = db.exec(query).all()
 
     if not result:
         raise HTTPException(status_code=404, detail="No patients found with given filters")
 
-    # ✅ Find latest regno for each UHID
-    latest_regnos = {}
-    for patient, _, _, _, _ in result:
-        uhid = patient.uhid
-        regno = int(patient.regno) if patient.regno and patient.regno.isdigit() else 0
-        if uhid not in latest_regnos or regno > latest_regnos[uhid]:
-            latest_regnos[uhid] = regno
+    total = db.exec(select(func.count()).select_from(patient_model.PatientDetails).where(*filters)).one()
+    response.headers["X-Total-Count"] = str(total)
+    if len(result) == limit:
+        response.headers["X-Next-Before"] = str(result[-1][0].id)
 
     # ✅ Map discharge and department/bed values
     patients = []
@@ -151,15 +187,234 @@ def filter_patients(
         p = patient.model_dump()
         p["dischargedate"] = dischargedate
         p["dischargetime"] = dischargetime
+        p["department_bed"] = f"{department} ({bed_number})" if department and bed_number else None
+        patients.append(p)
 
-        regno = int(patient.regno) if patient.regno and patient.regno.isdigit() else 0
+    return patients
 
-        # Only assign bed if this is the latest regno for that UHID
-        if regno == latest_regnos.get(patient.uhid) and department and bed_number:
-            p["department_bed"] = f"{department} ({bed_number})"
-        else:
-            p["department_bed"] = None
 
-        patients.append(p)
 
-    return patients
\ No newline at end of file
+# Several dashboards poll this; identical requests within the TTL share one query
+doctor_insights_cache = LRUCache(max_size=64, ttl_seconds=30)
+
+
+def parse_date_range(date_from: Optional[str], date_to: Optional[str]) -> tuple[str, str]:
+    """Validate YYYY-MM-DD bounds; default to the 30 days ending today."""
+    try:
+        end = datetime.strptime(date_to, "%Y-%m-%d") if date_to else datetime.now()
+        start = datetime.strptime(date_from, "%Y-%m-%d") if date_from else end - timedelta(days=29)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date_from and date_to must be in YYYY-MM-DD format")
+    if start > end:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+def period_start(day: str, granularity: str) -> str:
+    if granularity == "month":
+        return day[:7]
+    if granularity == "week":
+        parsed = datetime.strptime(day, "%Y-%m-%d")
+        return (parsed - timedelta(days=parsed.weekday())).strftime("%Y-%m-%d")
+    return day
+
+
+@router.get('/insights/doctors', response_model=dict)
+def get_doctor_workload(
+    date_from: Optional[str] = Query(None, description="YYYY-MM-DD, defaults to 29 days before date_to"),
+    date_to: Optional[str] = Query(None, description="YYYY-MM-DD, defaults to today"),
+    granularity: Literal["day", "week", "month"] = Query("day"),
+    db: Session = Depends(get_session)
+):
+    date_from, date_to = parse_date_range(date_from, date_to)
+
+    cache_key = (date_from, date_to, granularity)
+    cached = doctor_insights_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # One statement: registrations per (doctor, day, type) UNION ALL discharges per (doctor, day)
+    registrations = (
+        select(
+            patient_model.PatientDoctor.doctor.label("doctor"),
+            patient_model.PatientDoctor.dateofreg.label("day"),
+            patient_model.PatientDetails.patient_type.label("kind"),
+            func.count().label("total")
+        )
+        .join(patient_model.PatientDetails, patient_model.PatientDetails.id == patient_model.PatientDoctor.patient_id)
+        .where(
+            patient_model.PatientDoctor.dateofreg >= date_from,
+            patient_model.PatientDoctor.dateofreg <= date_to
+        )
+        .group_by(
+            patient_model.PatientDoctor.doctor,
+            patient_model.PatientDoctor.dateofreg,
+            patient_model.PatientDetails.patient_type
+        )
+    )
+    discharges = (
+        select(
+            FinalBillSummary.consultant_doctor,
+            FinalBillSummary.discharge_date,
+            literal("DISCHARGED"),
+            func.count()
+        )
+        .where(
+            FinalBillSummary.discharge_date >= date_from,
+            FinalBillSummary.discharge_date <= date_to,
+            FinalBillSummary.status != "CANCELLED"
+        )
+        .group_by(FinalBillSummary.consultant_doctor, FinalBillSummary.discharge_date)
+    )
+    rows = db.exec(union_all(registrations, discharges)).all()
+
+    kinds = ["OPD", "IPD", "DAYCARE", "DISCHARGED"]
+    doctors = {}
+    for doctor, day, kind, total in rows:
+        if kind not in kinds:
+            continue
+        entry = doctors.setdefault(doctor, {"totals": dict.fromkeys(kinds, 0), "periods": {}})
+        period = entry["periods"].setdefault(period_start(day, granularity), dict.fromkeys(kinds, 0))
+        period[kind] += total
+        entry["totals"][kind] += total
+
+    result = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "granularity": granularity,
+        "doctors": [
+            {
+                "doctor": doctor,
+                "totals": entry["totals"],
+                "periods": [{"period": period, **counts} for period, counts in sorted(entry["periods"].items())]
+            }
+            for doctor, entry in sorted(doctors.items())
+        ]
+    }
+    doctor_insights_cache.set(cache_key, result)
+    return result
+
+
+@router.get('/insights/collections', response_model=dict)
+def get_collections(
+    date_from: Optional[str] = Query(None, description="YYYY-MM-DD, defaults to 29 days before date_to"),
+    date_to: Optional[str] = Query(None, description="YYYY-MM-DD, defaults to today"),
+    db: Session = Depends(get_session)
+):
+    date_from, date_to = parse_date_range(date_from, date_to)
+
+    # One aggregate over the idx_transaction_date range; cancelled rows are excluded
+    rows = db.exec(
+        select(
+            TransactionSummary.transaction_date,
+            TransactionSummary.payment_mode,
+            TransactionSummary.transaction_purpose,
+            func.count(),
+            func.sum(TransactionSummary.amount)
+        )
+        .where(
+            TransactionSummary.transaction_date >= date_from,
+            TransactionSummary.transaction_date <= date_to,
+            TransactionSummary.status == "ACTIVE"
+        )
+        .group_by(
+            TransactionSummary.transaction_date,
+            TransactionSummary.payment_mode,
+            TransactionSummary.transaction_purpose
+        )
+        .order_by(
+            TransactionSummary.transaction_date,
+            TransactionSummary.payment_mode,
+            TransactionSummary.transaction_purpose
+        )
+    ).all()
+
+    collections = []
+    by_payment_mode = {}
+    grand_total = Decimal("0.00")
+    for day, payment_mode, purpose, count, total in rows:
+        total = Decimal(total or 0).quantize(Decimal("0.01"))
+        collections.append({
+            "date": day,
+            "payment_mode": payment_mode,
+            "transaction_purpose": purpose,
+            "count": count,
+            "total": f"{total:.2f}"
+        })
+        by_payment_mode[payment_mode] = by_payment_mode.get(payment_mode, Decimal("0.00")) + total
+        grand_total += total
+
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "collections": collections,
+        "total_by_payment_mode": {mode: f"{total:.2f}" for mode, total in sorted(by_payment_mode.items())},
+        "grand_total": f"{grand_total:.2f}"
+    }
+
+
+@router.get('/insights/beds', response_model=dict)
+def get_bed_utilization(
+    date_from: Optional[str] = Query(None, description="YYYY-MM-DD, defaults to 29 days before date_to"),
+    date_to: Optional[str] = Query(None, description="YYYY-MM-DD, defaults to today"),
+    db: Session = Depends(get_session)
+):
+    """Occupancy %, turnover and length of stay per department.
+
+    Closed occupancy comes from the bed_daily_stats rollup (one row per day and
+    department). Beds occupied right now add the part of their open segment that
+    falls inside the range. Capacity is today's bed count per department.
+    """
+    date_from, date_to = parse_date_range(date_from, date_to)
+    range_start = datetime.strptime(date_from, "%Y-%m-%d")
+    range_end = min(datetime.strptime(date_to, "%Y-%m-%d") + timedelta(days=1), ist_now())
+    range_seconds = max((range_end - range_start).total_seconds(), 0)
+
+    beds_by_department = dict(db.exec(
+        select(BedDetails.department, func.count()).group_by(BedDetails.department)
+    ).all())
+
+    totals = {department: dict.fromkeys(BED_STAT_COUNTERS, 0) for department in beds_by_department}
+    rows = db.exec(
+        select(
+            BedDailyStats.department,
+            *(func.sum(getattr(BedDailyStats, name)) for name in BED_STAT_COUNTERS)
+        )
+        .where(BedDailyStats.stat_date >= date_from, BedDailyStats.stat_date <= date_to)
+        .group_by(BedDailyStats.department)
+    ).all()
+    for department, *sums in rows:
+        # Departments no longer in the inventory still report their history
+        row = totals.setdefault(department, dict.fromkeys(BED_STAT_COUNTERS, 0))
+        for name, value in zip(BED_STAT_COUNTERS, sums):
+            row[name] += value or 0
+
+    # Open segments: every occupied bed since its last allot or shift in
+    open_segments = db.exec(
+        select(BedDetails.department, BedDetails.occupied_since)
+        .where(BedDetails.status == "occupied", BedDetails.occupied_since.is_not(None))
+    ).all()
+    for department, started_at in open_segments:
+        overlap = (range_end - max(started_at, range_start)).total_seconds()
+        if overlap > 0 and department in totals:
+            totals[department]["occupied_seconds"] += overlap
+
+    departments = []
+    for department, row in totals.items():
+        beds = beds_by_department.get(department, 0)
+        capacity = beds * range_seconds
+        departments.append({
+            "department": department,
+            "beds": beds,
+            "occupancy_pct": round(100 * row["occupied_seconds"] / capacity, 1) if capacity else None,
+            "admissions": row["admissions"],
+            "discharges": row["discharges"],
+            "turnover": round(row["discharges"] / beds, 2) if beds else None,
+            "avg_length_of_stay_hours": round(row["stay_seconds"] / row["stays"] / 3600, 1) if row["stays"] else None
+        })
+
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "departments": departments
+    }
@@ -3,9 +3,9 @@ from sqlmodel import Session, select, SQLModel
 from fastapi import APIRouter, Depends, HTTPException
 from database import engine
 from models.bed_model import BedDetails
-from models.patient_model import PatientDetails
 from schemas.bed_schemas import BedDetailsResponseSchema
 from schemas.patient_schemas import PatientDetailsSearchResponseSchema
+from services.patient_cache import get_cached_latest_visit
 
 router = APIRouter(tags=['TPA'])
 
@@ -18,8 +18,8 @@ def get_session():
 def get_bed_by_uhid(uhid: str, db: Session = Depends(get_session)):
     # Query BedDetails by uhid
     beds = db.exec(select(BedDetails).where(BedDetails.uhid == uhid)).first()
-    # Query PatientDetails by uhid
-    patient = db.exec(select(PatientDetails).where(PatientDetails.uhid == uhid)).first()
+    # Latest registration for this UHID
+    patient = get_cached_latest_visit(db, uhid)
     # Prepare response
     response = {
         "beds": BedDetailsResponseSchema.model_validate(beds),
@@ -1,23 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import literal, tuple_
 from sqlmodel import Session, select, text
-from models.patient_model import PatientDetails
 from models.transaction_model import TransactionSummary
 from schemas.transaction_schemas import TransactionSummaryCreate, PatientDetailsSearchSchemaForTransaction, TransactionSummaryShowSchema, AllTransactionSummaryShowSchema, UpdateTransactionSchema
-from typing import List
-from database import engine
-import models.transaction_model as transactionModel
+from typing import List, Literal, Optional
+from datetime import datetime
+import csv
+import io
+import json
+from database import engine, on_conflict_insert
 import models.patient_model as patient_model
-
-def create_db_and_tables():
-
-    # with engine.connect() as conn:
-    #     conn.execute(text("DROP TABLE IF EXISTS transaction_summary CASCADE"))
-    #     conn.commit()
-        
-    # transactionModel.TransactionSummary.__table__.drop(engine, checkfirst=True)
-    transactionModel.TransactionSummary.__table__.create(engine, checkfirst=True)
-
-create_db_and_tables()
+from models.types import DateString
+from services.dates import validate_date_params
+from services.document_numbers import is_server_number, issue_number
+from services.idempotency import start_idempotent_request, store_response
+from services.patient_cache import get_cached_latest_visit
 
 router = APIRouter(tags=["Transactions"])
 
@@ -25,8 +23,15 @@ def get_session():
     with Session(engine) as session:
         yield session
 
+CREATE_TRANSACTION = "POST /transactions"
+
+
 @router.post("/transactions", response_model=TransactionSummaryShowSchema)
-def create_transaction(req: TransactionSummaryCreate, db: Session = Depends(get_session)):
+def create_transaction(
+    req: TransactionSummaryCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_session)
+):
     # Validate payment_mode
     valid_payment_modes = ["CASH", "DEBIT / CREDIT CARD", "UPI", "CHEQUE", "CASHLESS"]
     if req.payment_mode not in valid_payment_modes:
@@ -35,19 +40,20 @@ def create_transaction(req: TransactionSummaryCreate, db: Session = Depends(get_
             detail=f"Invalid payment mode. Must be one of: {', '.join(valid_payment_modes)}"
         )
 
-    # Check if transaction_no already exists
-    existing_transaction = db.exec(
-        select(TransactionSummary).where(
-            TransactionSummary.transaction_no == req.transaction_no
-        )
-    ).first()
-    
-    if existing_transaction:
+    if req.transaction_no and is_server_number("transaction_no", req.transaction_no):
         raise HTTPException(
             status_code=400,
-            detail="Transaction number already exists"
+            detail="Transaction numbers in this format are issued by the server; omit transaction_no"
         )
 
+    if idempotency_key:
+        replayed = start_idempotent_request(db, idempotency_key, CREATE_TRANSACTION, req)
+        if replayed:
+            return replayed
+
+    # Drawn only once this request will insert, so replays leave no gaps
+    transaction_no = req.transaction_no or issue_number(db, "transaction_no")
+
     # Create TransactionSummary instance
     db_transaction = TransactionSummary(
         patient_uhid=req.patient_uhid,
@@ -60,20 +66,130 @@ def create_transaction(req: TransactionSummaryCreate, db: Session = Depends(get_
         payment_details=req.payment_details,
         transaction_date=req.transaction_date,
         transaction_time=req.transaction_time,
-        transaction_no=req.transaction_no,
+        transaction_no=transaction_no,
         created_by=req.created_by
     )
 
-    # Save to database
-    db.add(db_transaction)
+    # The unique transaction_no decides; no separate existence check
+    db_transaction = db.exec(
+        on_conflict_insert(db, TransactionSummary)
+        .values(**db_transaction.model_dump(exclude={"id"}, exclude_none=True))
+        .on_conflict_do_nothing(index_elements=["transaction_no"])
+        .returning(TransactionSummary)
+    ).scalars().first()
+
+    if db_transaction is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Transaction number already exists"
+        )
+
+    if idempotency_key:
+        store_response(
+            db, idempotency_key, CREATE_TRANSACTION, 200,
+            TransactionSummaryShowSchema.model_validate(db_transaction).model_dump(mode="json")
+        )
     db.commit()
     db.refresh(db_transaction)
-    
+
     return db_transaction
 
+
+# Rows fetched per round trip when exporting from a server-side cursor
+STREAM_CHUNK_SIZE = 500
+
+EXPORT_COLUMNS = list(TransactionSummaryShowSchema.model_fields)
+
+
+def parse_transaction_cursor(after: str) -> tuple[str, int]:
+    """Split an X-Next-After cursor ("YYYY-MM-DD:id") into its keyset values."""
+    try:
+        day, row_id = after.split(":")
+        datetime.strptime(day, "%Y-%m-%d")
+        return day, int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="after must be a cursor returned in X-Next-After")
+
+
+def transaction_csv_rows(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for txn in rows:
+        item = TransactionSummaryShowSchema.model_validate(txn).model_dump(mode="json")
+        if item["payment_details"] is not None:
+            item["payment_details"] = json.dumps(item["payment_details"])
+        writer.writerow([item[column] for column in EXPORT_COLUMNS])
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
 @router.get("/transactions", response_model=List[TransactionSummaryShowSchema])
-def get_transactions(db: Session = Depends(get_session)):
-    transactions = db.exec(select(TransactionSummary)).all()
+def get_transactions(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-After header"),
+    date_from: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    date_to: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    payment_mode: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    purpose: Optional[str] = Query(None, description="transaction_purpose"),
+    created_by: Optional[str] = Query(None),
+    export: Optional[Literal["ndjson", "csv"]] = Query(None, description="Stream every matching row instead of one page"),
+    db: Session = Depends(get_session)
+):
+    """Transactions ordered by (transaction_date, id), one keyset page at a time."""
+    validate_date_params(date_from=date_from, date_to=date_to)
+
+    query = select(TransactionSummary)
+    if after:
+        day, row_id = parse_transaction_cursor(after)
+        query = query.where(
+            tuple_(TransactionSummary.transaction_date, TransactionSummary.id)
+            > tuple_(literal(day, DateString), literal(row_id))
+        )
+    if date_from:
+        query = query.where(TransactionSummary.transaction_date >= date_from)
+    if date_to:
+        query = query.where(TransactionSummary.transaction_date <= date_to)
+    if payment_mode:
+        query = query.where(TransactionSummary.payment_mode == payment_mode)
+    if status:
+        query = query.where(TransactionSummary.status == status)
+    if purpose:
+        query = query.where(TransactionSummary.transaction_purpose == purpose)
+    if created_by:
+        query = query.where(TransactionSummary.created_by == created_by)
+    query = query.order_by(TransactionSummary.transaction_date, TransactionSummary.id)
+
+    if export:
+        def export_rows():
+            # Own session: the request-scoped one may be closed while we are still streaming
+            with Session(engine) as stream_db:
+                rows = stream_db.exec(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+                if export == "csv":
+                    yield from transaction_csv_rows(rows)
+                    return
+                for txn in rows:
+                    yield TransactionSummaryShowSchema.model_validate(txn).model_dump_json() + "\n"
+
+        if export == "csv":
+            return StreamingResponse(
+                export_rows(),
+                media_type="text/csv",
+                headers={"Content-Disposition": 'attachment; filename="transactions.csv"'}
+            )
+        return StreamingResponse(export_rows(), media_type="application/x-ndjson")
+
+    transactions = db.exec(query.limit(limit)).all()
+    # Cursor for the next page travels in a header so the body stays a plain list
+    if len(transactions) == limit:
+        last = transactions[-1]
+        response.headers["X-Next-After"] = f"{last.transaction_date}:{last.id}"
     return transactions
 
 
@@ -82,12 +198,7 @@ def get_transactions(db: Session = Depends(get_session)):
 def get_patient_for_transaction(uhid: str, db: Session = Depends(get_session)):
 
     # Step 1: Get latest registration for this UHID
-    latest_patient = db.exec(
-        select(PatientDetails)
-        .where(PatientDetails.uhid == uhid)
-        .order_by(PatientDetails.regno.desc())  # latest regno here found out
-        .limit(1)
-    ).first()
+    latest_patient = get_cached_latest_visit(db, uhid)
 
     if not latest_patient:
         raise HTTPException(status_code=404, detail=f"No registration found for UHID {uhid}")
@@ -1,6 +1,6 @@
-from sqlmodel import SQLModel
-from typing import Optional
-from pydantic import field_validator
+from sqlmodel import SQLModel, Field
+from typing import List, Literal, Optional
+from pydantic import field_validator, model_validator
 
 class BedDetailsCreateSchema(SQLModel):
     uhid: Optional[str] = None
@@ -29,4 +29,27 @@ class BedDetailsResponseSchema(SQLModel):
     patient_name: str
     department: str
     bed_number: str
-    status: str
\ No newline at end of file
+    status: str
+class BedBatchOperation(SQLModel):
+    op: Literal["allot", "release", "shift"]
+    bed_number: str  # bed to allot, release, or shift into
+    uhid: Optional[str] = None  # required for allot and shift
+    patient_name: Optional[str] = None  # required for allot
+
+    @field_validator('uhid', mode='before')
+    def validate_uhid(cls, v):
+        if v is not None:
+            if not v.isdigit() or len(v) != 8:
+                raise ValueError("UHID must be exactly 8 digits")
+        return v
+
+    @model_validator(mode='after')
+    def check_required_fields(self):
+        if self.op in ("allot", "shift") and not self.uhid:
+            raise ValueError(f"uhid is required for {self.op}")
+        if self.op == "allot" and not (self.patient_name or "").strip():
+            raise ValueError("patient_name is required for allot")
+        return self
+
+class BedBatchRequest(SQLModel):
+    operations: List[BedBatchOperation] = Field(min_length=1, max_length=50)
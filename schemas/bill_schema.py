@@ -1,7 +1,9 @@
 from decimal import Decimal
 from typing import List, Optional
-from pydantic import field_serializer
+from datetime import datetime
+from pydantic import field_serializer, field_validator
 from sqlmodel import Field, SQLModel
+from models.types import TIME_FORMAT_24H, parse_time
 
 
 class AllTransactionSummaryShowSchemaForBill(SQLModel):
@@ -76,7 +78,7 @@ class TotalDiscount(SQLModel):
 
 
 class FinalBillSummaryCreate(SQLModel):
-    final_bill_no: str
+    final_bill_no: Optional[str] = None  # issued by the server when omitted
     patient_uhid: str
     patient_regno: str
     patient_name: str
@@ -101,6 +103,22 @@ class FinalBillSummaryCreate(SQLModel):
     balance: Optional[Decimal] = None
     created_by: str
 
+    @field_validator('admission_date', 'discharge_date')
+    def validate_dates(cls, v):
+        try:
+            datetime.strptime(v, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("Date must be in YYYY-MM-DD format")
+        return v
+
+    @field_validator('admission_time', 'discharge_time')
+    def validate_times(cls, v):
+        try:
+            # Stored and returned as 24-hour
+            return parse_time(v).strftime(TIME_FORMAT_24H)
+        except ValueError:
+            raise ValueError("Time must be in HH:MM:SS (24-hour) or HH:MM:SS AM/PM (12-hour) format")
+
 
 
 
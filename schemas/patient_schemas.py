@@ -103,7 +103,9 @@ class PatientDetailsCreateSchema(SQLModel):
 
     @field_validator('dateofreg', mode='before')
     def handle_invalid_date(cls, v):
-        if v and v != "string":
+        if v == "string":  # Swagger placeholder: let the server default apply
+            return None
+        if v:
             try:
                 datetime.strptime(v, "%Y-%m-%d")
             except ValueError:
@@ -112,7 +114,9 @@ class PatientDetailsCreateSchema(SQLModel):
 
     @field_validator('time', mode='before')
     def handle_invalid_time(cls, v):
-        if v and v != "string":
+        if v == "string":
+            return None
+        if v:
             try:
                 datetime.strptime(v, "%I:%M:%S %p")
             except ValueError:
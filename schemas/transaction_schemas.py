@@ -16,7 +16,7 @@ class TransactionSummaryCreate(SQLModel):
     payment_details: Optional[dict] = None
     transaction_date: str
     transaction_time: str
-    transaction_no: str
+    transaction_no: Optional[str] = None  # issued by the server when omitted
     created_by: str
 
     @field_validator('amount', mode='before')
@@ -56,8 +56,8 @@ class TransactionSummaryCreate(SQLModel):
         except ValueError:
             try:
                 # Check if it's in 12-hour format with AM/PM
-                datetime.strptime(v, "%I:%M:%S %p")
-                return v  # <-- No conversion, return as-is
+                # Stored and returned as 24-hour, like every transaction time
+                return datetime.strptime(v, "%I:%M:%S %p").strftime("%H:%M:%S")
             except ValueError:
                 raise ValueError("Time must be in HH:MM:SS (24-hour) or HH:MM:SS AM/PM (12-hour) format")
 
@@ -112,7 +112,6 @@ class TransactionSummaryCreate(SQLModel):
                 },
                 "transaction_date": "2025-07-31",
                 "transaction_time": "15:30:00",
-                "transaction_no": "TXN202507310001",
                 "created_by": "Dr. Smith"
             }
         }
@@ -0,0 +1,158 @@
+"""Process-level bed occupancy snapshot with a shared, monotonic version.
+
+/beds and /beds/available are polled by every reception terminal, but beds
+change only a few times an hour. BedBoard keeps the current bed rows in memory
+and rebuilds them only after a change:
+
+* Writers call record_bed_change() before commit. It bumps the single-row
+  bed_board_version counter in the same transaction and returns an event
+  message. After commit they call publish_bed_event(message).
+* The event bus delivers the message to every subscriber. LocalEventBus does
+  this in-process. PgNotifyBedEventBus uses Postgres NOTIFY/LISTEN, so every
+  worker sees it; NOTIFY payloads are capped at 8000 bytes, so only the bed
+  numbers travel and each listener reloads those rows. BedBoard subscribes and
+  marks its snapshot stale.
+* The version comes from the database, so all workers agree on it and it works
+  as an ETag. As a safety net, a snapshot older than SNAPSHOT_MAX_AGE is
+  rebuilt even if an event was lost.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Callable
+from sqlalchemy import update
+from sqlmodel import Session, select
+from models.bed_model import BedBoardVersion, BedDetails
+from schemas.bed_schemas import BedDetailsResponseSchema
+from services.event_bus import NOTIFY_PAYLOAD_LIMIT, LocalEventBus, PgNotifyEventBus, switch_bus
+
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "bed_board"
+SNAPSHOT_MAX_AGE = 60.0
+RESYNC_MESSAGE = {"version": None, "event": "resync", "beds": []}
+
+
+class PgNotifyBedEventBus(PgNotifyEventBus):
+    """Bed events over NOTIFY/LISTEN.
+
+    The payload carries bed numbers instead of bed rows; the listener loads the
+    rows before delivering, so subscribers see the same message shape as on the
+    local bus.
+    """
+
+    def __init__(self, engine):
+        super().__init__(engine, NOTIFY_CHANNEL)
+
+    def encode(self, message: dict) -> str:
+        payload = json.dumps({
+            "version": message["version"],
+            "event": message["event"],
+            "bed_numbers": [bed["bed_number"] for bed in message["beds"]],
+        })
+        if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT:
+            # Listeners cannot tell which beds changed; they reload everything
+            payload = json.dumps({"version": message["version"], "event": message["event"], "bed_numbers": None})
+        return payload
+
+    def decode(self, payload: str) -> dict:
+        """Turn a NOTIFY payload back into an event message with the current bed rows."""
+        payload = json.loads(payload)
+        if payload["bed_numbers"] is None:
+            return dict(RESYNC_MESSAGE)
+        with Session(self.engine) as session:
+            beds = session.exec(
+                select(BedDetails)
+                .where(BedDetails.bed_number.in_(payload["bed_numbers"]))
+                .order_by(BedDetails.bed_id)
+            ).all()
+        return {
+            "version": payload["version"],
+            "event": payload["event"],
+            "beds": [BedDetailsResponseSchema.model_validate(bed).model_dump() for bed in beds],
+        }
+
+    def reconnect_message(self) -> dict:
+        return dict(RESYNC_MESSAGE)
+
+
+class BedBoard:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._beds = []
+        self._loaded_at = 0.0
+        self._stale = True
+        self._views = {}
+
+    def on_event(self, message: dict):
+        version = message.get("version")
+        if version is None or self._version is None or version > self._version:
+            self._stale = True
+
+    def snapshot(self, db: Session) -> tuple[int, list[dict]]:
+        """Current (version, beds) where beds are BedDetailsResponseSchema dicts in bed_id order."""
+        with self._lock:
+            if self._stale or time.monotonic() - self._loaded_at > SNAPSHOT_MAX_AGE:
+                # Clear the flag first so an event arriving during the reload marks it stale again
+                self._stale = False
+                version = db.exec(select(BedBoardVersion.version).where(BedBoardVersion.id == 1)).first() or 0
+                beds = db.exec(select(BedDetails).order_by(BedDetails.bed_id)).all()
+                self._beds = [BedDetailsResponseSchema.model_validate(bed).model_dump() for bed in beds]
+                self._version = version
+                self._loaded_at = time.monotonic()
+                self._views = {}
+            return self._version, self._beds
+
+    def view(self, db: Session, name: str, build: Callable[[list[dict]], dict]) -> tuple[int, dict]:
+        """A response body derived from the snapshot, built once per version."""
+        version, beds = self.snapshot(db)
+        with self._lock:
+            if self._version == version and name in self._views:
+                return version, self._views[name]
+            body = build(beds)
+            if self._version == version:
+                self._views[name] = body
+            return version, body
+
+
+bed_board = BedBoard()
+bed_event_bus = LocalEventBus()
+bed_event_bus.subscribe(bed_board.on_event)
+
+
+def set_bed_event_bus(bus: LocalEventBus):
+    """Swap the event bus (e.g. PgNotifyBedEventBus at startup), keeping subscribers."""
+    global bed_event_bus
+    bed_event_bus = switch_bus(bed_event_bus, bus)
+
+
+def record_bed_change(db: Session, event: str, beds: list[BedDetails]) -> dict:
+    """Bump the shared version inside the caller's transaction and build the event message."""
+    version = db.exec(
+        update(BedBoardVersion)
+        .where(BedBoardVersion.id == 1)
+        .values(version=BedBoardVersion.version + 1)
+        .returning(BedBoardVersion.version)
+    ).scalar()
+    if version is None:
+        db.add(BedBoardVersion(id=1, version=1))
+        version = 1
+    return {
+        "version": version,
+        "event": event,
+        "beds": [BedDetailsResponseSchema.model_validate(bed).model_dump() for bed in beds],
+    }
+
+
+def publish_bed_event(message: dict):
+    """Call after commit so other workers never reload a snapshot without the change."""
+    try:
+        bed_event_bus.publish(message)
+    except Exception:
+        # Other workers' snapshots still refresh after SNAPSHOT_MAX_AGE; this
+        # worker's board and stream clients get the event directly
+        logger.exception("Could not publish bed event")
+        bed_event_bus.deliver(message)
@@ -0,0 +1,181 @@
+"""Append-only bed_event log and the bed_daily_stats rollup behind /insights/beds.
+
+Routers call record_allot / record_release / record_shift inside the transaction
+that changes the bed, after the bed rows are locked. Each call appends to
+bed_event and bumps bed_daily_stats in the same transaction:
+
+* allot and shift_in open an occupancy segment and count as an admission.
+* release and shift_out close the segment. Its seconds are split across the
+  calendar days it covered, so occupancy is never recomputed from raw events.
+* release also closes the patient's stay, measured from the first allotment
+  and carried across shifts.
+
+The open segment lives on the bed row itself (occupied_since, admitted_at), so
+closing one and adding open segments at query time never search the log.
+The rollup can always be rebuilt from the log with:
+
+    python -m services.bed_events rebuild
+"""
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import pytz
+from sqlalchemy import delete
+from sqlmodel import Session, select
+from database import engine, on_conflict_insert
+from models.bed_model import BedDailyStats, BedDetails, BedEvent
+
+
+COUNTERS = ("admissions", "discharges", "occupied_seconds", "stays", "stay_seconds")
+# "baseline" marks beds already occupied when the log was introduced
+OPENING_EVENTS = ("allot", "shift_in", "baseline")
+
+
+def ist_now() -> datetime:
+    """Naive IST wall-clock time; bed_event stores hospital-local timestamps."""
+    return datetime.now(timezone.utc).astimezone(pytz.timezone("Asia/Kolkata")).replace(tzinfo=None)
+
+
+def seconds_by_day(start: datetime, end: datetime) -> list[tuple[str, int]]:
+    """Split [start, end) into (YYYY-MM-DD, seconds) pieces at midnight."""
+    pieces = []
+    while start < end:
+        midnight = datetime.combine(start.date() + timedelta(days=1), datetime.min.time())
+        piece_end = min(end, midnight)
+        pieces.append((start.strftime("%Y-%m-%d"), int((piece_end - start).total_seconds())))
+        start = piece_end
+    return pieces
+
+
+def bump_bed_stats(db: Session, stat_date: str, department: str, **deltas: int):
+    """Add deltas to the (stat_date, department) row with one INSERT ... ON CONFLICT."""
+    values = {name: deltas.get(name, 0) for name in COUNTERS}
+    stmt = on_conflict_insert(db, BedDailyStats).values(stat_date=stat_date, department=department, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["stat_date", "department"],
+        set_={
+            name: getattr(BedDailyStats.__table__.c, name) + getattr(stmt.excluded, name)
+            for name in COUNTERS
+        },
+    )
+    db.exec(stmt)
+
+
+def _open(db: Session, event: str, bed: BedDetails, uhid: Optional[str], at: datetime, admitted_at: datetime):
+    db.add(BedEvent(
+        occurred_at=at, event=event, bed_number=bed.bed_number, department=bed.department,
+        uhid=uhid, admitted_at=admitted_at,
+    ))
+    bed.occupied_since, bed.admitted_at = at, admitted_at
+    db.add(bed)
+    bump_bed_stats(db, at.strftime("%Y-%m-%d"), bed.department, admissions=1)
+
+
+def _close(db: Session, event: str, bed: BedDetails, uhid: Optional[str], at: datetime) -> Optional[datetime]:
+    """Log the closing event and roll the bed's open segment into the daily stats; returns admitted_at."""
+    admitted_at = None
+    if bed.occupied_since:
+        admitted_at = bed.admitted_at or bed.occupied_since
+        for day, seconds in seconds_by_day(bed.occupied_since, at):
+            bump_bed_stats(db, day, bed.department, occupied_seconds=seconds)
+    db.add(BedEvent(
+        occurred_at=at, event=event, bed_number=bed.bed_number, department=bed.department,
+        uhid=uhid, admitted_at=admitted_at,
+    ))
+    bed.occupied_since, bed.admitted_at = None, None
+    db.add(bed)
+    return admitted_at
+
+
+def record_allot(db: Session, bed: BedDetails, at: Optional[datetime] = None):
+    at = at or ist_now()
+    _open(db, "allot", bed, bed.uhid, at, at)
+
+
+def record_release(db: Session, bed: BedDetails, uhid: Optional[str], at: Optional[datetime] = None):
+    """Call with the bed's department; uhid is the patient who just left."""
+    at = at or ist_now()
+    admitted_at = _close(db, "release", bed, uhid, at)
+    day = at.strftime("%Y-%m-%d")
+    if admitted_at:
+        bump_bed_stats(db, day, bed.department, discharges=1, stays=1,
+                       stay_seconds=int((at - admitted_at).total_seconds()))
+    else:
+        bump_bed_stats(db, day, bed.department, discharges=1)
+
+
+def record_shift(db: Session, source: BedDetails, target: BedDetails, uhid: str, at: Optional[datetime] = None):
+    at = at or ist_now()
+    admitted_at = _close(db, "shift_out", source, uhid, at)
+    _open(db, "shift_in", target, uhid, at, admitted_at or at)
+
+
+def record_moves(db: Session, moves: list[tuple[str, Optional[BedDetails], Optional[BedDetails]]], at: Optional[datetime] = None):
+    """Log a batch of (uhid, source bed or None, target bed or None) moves.
+
+    Every segment is closed before any is opened, so in a swap neither patient's
+    shift_in is mistaken for the other's open segment.
+    """
+    at = at or ist_now()
+    admitted = {}
+    for uhid, source, target in moves:
+        if source and target:
+            admitted[uhid] = _close(db, "shift_out", source, uhid, at)
+        elif source:
+            record_release(db, source, uhid, at)
+    for uhid, source, target in moves:
+        if source and target:
+            _open(db, "shift_in", target, uhid, at, admitted[uhid] or at)
+        elif target:
+            _open(db, "allot", target, uhid, at, at)
+
+
+def rebuild_bed_stats(db: Session) -> int:
+    """Recompute bed_daily_stats and the beds' open segments by replaying bed_event in order."""
+    # Locked first so no allot or release lands between the replay and the bed update
+    beds = db.exec(select(BedDetails).with_for_update()).all()
+    rows = {}
+
+    def bump(day, department, **deltas):
+        row = rows.setdefault((day, department), dict.fromkeys(COUNTERS, 0))
+        for name, value in deltas.items():
+            row[name] += value
+
+    segments = {}
+    for event in db.exec(select(BedEvent).order_by(BedEvent.id)):
+        day = event.occurred_at.strftime("%Y-%m-%d")
+        if event.event in OPENING_EVENTS:
+            segments[event.bed_number] = event
+            if event.event != "baseline":
+                bump(day, event.department, admissions=1)
+            continue
+        segment = segments.pop(event.bed_number, None)
+        if segment:
+            for piece_day, seconds in seconds_by_day(segment.occurred_at, event.occurred_at):
+                bump(piece_day, segment.department, occupied_seconds=seconds)
+        if event.event == "release":
+            bump(day, event.department, discharges=1)
+            if event.admitted_at:
+                bump(day, event.department, stays=1,
+                     stay_seconds=int((event.occurred_at - event.admitted_at).total_seconds()))
+
+    for bed in beds:
+        segment = segments.get(bed.bed_number) if bed.status == "occupied" else None
+        bed.occupied_since = segment.occurred_at if segment else None
+        bed.admitted_at = (segment.admitted_at or segment.occurred_at) if segment else None
+        db.add(bed)
+
+    db.exec(delete(BedDailyStats))
+    db.add_all(
+        BedDailyStats(stat_date=day, department=department, **counters)
+        for (day, department), counters in rows.items()
+    )
+    db.commit()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m services.bed_events rebuild")
+    with Session(engine) as session:
+        print(f"bed_daily_stats rebuilt with {rebuild_bed_stats(session)} rows")
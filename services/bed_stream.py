@@ -0,0 +1,62 @@
+"""Fan-out of bed board events to Server-Sent Events subscribers.
+
+One BedEventBroadcaster per worker subscribes to the bed event bus and copies
+each message into a bounded asyncio.Queue per connected client. Idle clients
+cost one pending queue.get() each; nothing polls. A client that falls too far
+behind gets a "resync" marker instead of an unbounded backlog.
+"""
+import asyncio
+import json
+import threading
+
+from services.bed_board import RESYNC_MESSAGE, bed_event_bus
+
+
+CLIENT_QUEUE_SIZE = 100
+
+
+class BedEventBroadcaster:
+    def __init__(self):
+        self._clients = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        with self._lock:
+            self._clients.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._clients = {(loop, q) for loop, q in self._clients if q is not queue}
+
+    def subscriber_count(self) -> int:
+        return len(self._clients)
+
+    def on_event(self, message: dict):
+        """Bus callback; may run on any thread."""
+        with self._lock:
+            clients = list(self._clients)
+        for loop, queue in clients:
+            loop.call_soon_threadsafe(self._put, queue, message)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, message: dict):
+        if queue.full():
+            # Drop the backlog; the client reloads the whole board instead
+            while not queue.empty():
+                queue.get_nowait()
+            message = RESYNC_MESSAGE
+        queue.put_nowait(message)
+
+
+def format_sse(event: str, version, data: dict) -> str:
+    """One SSE frame; the id is the board version so EventSource resends it as Last-Event-ID."""
+    frame = f"event: {event}\n"
+    if version is not None:
+        frame += f"id: {version}\n"
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+
+broadcaster = BedEventBroadcaster()
+bed_event_bus.subscribe(broadcaster.on_event)
@@ -0,0 +1,61 @@
+"""Bed inventory sync from bed_inventory.json (or $BED_INVENTORY_FILE).
+
+Adding a ward or bed is a change to that file followed by a sync, either at
+app startup (lifespan hook) or by hand:
+
+    python -m services.beds sync
+
+New beds are added with one INSERT ... ON CONFLICT (bed_number) DO NOTHING, so
+existing beds and their occupancy are never touched.
+"""
+import json
+import os
+import sys
+from typing import Optional
+from sqlmodel import Session
+from database import engine, on_conflict_insert
+from models.bed_model import BedDetails
+from services.bed_board import publish_bed_event, record_bed_change
+
+
+# Departments and their beds, e.g. [{"name": "ICU - 3rd Floor", "beds": ["ICU-1", ...]}]
+BED_INVENTORY_FILE = os.getenv(
+    "BED_INVENTORY_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bed_inventory.json")
+)
+
+
+def load_bed_inventory(path: str = BED_INVENTORY_FILE) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        departments = json.load(f)
+    for dept in departments:
+        if not dept.get("name") or not isinstance(dept.get("beds"), list):
+            raise ValueError(f"{path}: every department needs a name and a list of beds")
+    return departments
+
+
+def sync_bed_inventory(db: Session, departments: Optional[list[dict]] = None) -> int:
+    """Insert any bed from the inventory file that is missing. Returns the number added."""
+    rows = [
+        {"department": dept["name"], "bed_number": bed_number, "patient_name": "", "uhid": None, "status": "available"}
+        for dept in (departments if departments is not None else load_bed_inventory())
+        for bed_number in dept["beds"]
+    ]
+    if not rows:
+        return 0
+    result = db.exec(
+        on_conflict_insert(db, BedDetails).values(rows).on_conflict_do_nothing(index_elements=["bed_number"])
+    )
+    added = result.rowcount
+    event = record_bed_change(db, "inventory", []) if added else None
+    db.commit()
+    if event:
+        publish_bed_event(event)
+    return added
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["sync"]:
+        sys.exit("usage: python -m services.beds sync")
+    with Session(engine) as session:
+        print(f"Added {sync_bed_inventory(session)} beds")
@@ -0,0 +1,86 @@
+"""Helpers for the daily_census rollup used by /patients/count_and_graph.
+
+Writers call bump_census() inside their own session so the counter moves in the
+same transaction as the row it describes. The table can always be rebuilt from
+history with:
+
+    python -m services.census rebuild
+"""
+import sys
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+from database import engine, on_conflict_insert
+from models.bill_model import FinalBillSummary
+from models.census_model import DailyCensus
+from models.patient_model import PatientDetails
+
+
+COUNTERS = ("registrations", "discharges", "cancellations")
+
+
+def bump_census(db: Session, census_date: str, patient_type: str, **deltas: int):
+    """Add deltas (e.g. registrations=1) to the (census_date, patient_type) row.
+
+    Uses a single INSERT ... ON CONFLICT DO UPDATE so concurrent writers never
+    lose an increment. Nothing is committed here; the caller's commit does it.
+    """
+    if not census_date or not patient_type:
+        return
+    values = {name: deltas.get(name, 0) for name in COUNTERS}
+    stmt = on_conflict_insert(db, DailyCensus).values(
+        census_date=census_date, patient_type=patient_type, **values
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["census_date", "patient_type"],
+        set_={
+            name: getattr(DailyCensus.__table__.c, name) + getattr(stmt.excluded, name)
+            for name in COUNTERS
+        },
+    )
+    db.exec(stmt)
+
+
+def rebuild_census(db: Session) -> int:
+    """Recompute every daily_census row from PatientDetails and FinalBillSummary."""
+    rows = {}
+
+    def row(day, p_type):
+        return rows.setdefault((day, p_type), dict.fromkeys(COUNTERS, 0))
+
+    registrations = db.exec(
+        select(PatientDetails.dateofreg, PatientDetails.patient_type, func.count())
+        .group_by(PatientDetails.dateofreg, PatientDetails.patient_type)
+    ).all()
+    for day, p_type, count in registrations:
+        row(day, p_type)["registrations"] = count
+
+    discharges = db.exec(
+        select(FinalBillSummary.discharge_date, FinalBillSummary.patient_type, func.count())
+        .group_by(FinalBillSummary.discharge_date, FinalBillSummary.patient_type)
+    ).all()
+    for day, p_type, count in discharges:
+        row(day, p_type)["discharges"] = count
+
+    cancellations = db.exec(
+        select(FinalBillSummary.discharge_date, FinalBillSummary.patient_type, func.count())
+        .where(FinalBillSummary.status == "CANCELLED")
+        .group_by(FinalBillSummary.discharge_date, FinalBillSummary.patient_type)
+    ).all()
+    for day, p_type, count in cancellations:
+        row(day, p_type)["cancellations"] = count
+
+    db.exec(delete(DailyCensus))
+    db.add_all(
+        DailyCensus(census_date=day, patient_type=p_type, **counters)
+        for (day, p_type), counters in rows.items()
+        if day and p_type
+    )
+    db.commit()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m services.census rebuild")
+    with Session(engine) as session:
+        print(f"daily_census rebuilt with {rebuild_census(session)} rows")
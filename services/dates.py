@@ -0,0 +1,19 @@
+"""Validation for YYYY-MM-DD query parameters.
+
+Date columns bind through DateString, which cannot parse free text. Handlers
+check their date filters up front so a bad value is a 400, not a 500.
+"""
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+
+
+def validate_date_params(**params: Optional[str]):
+    """Raise 400 naming the first given parameter that is not YYYY-MM-DD."""
+    for name, value in params.items():
+        if value is None:
+            continue
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"{name} must be in YYYY-MM-DD format")
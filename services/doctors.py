@@ -0,0 +1,31 @@
+"""Keeps patient_doctor in step with PatientDetails.doctorIncharge.
+
+Doctor filters and counts join this table on (doctor, dateofreg) instead of
+running ILIKE over the JSON column.
+"""
+from sqlalchemy import insert
+from sqlmodel import Session
+from models.patient_model import PatientDetails, PatientDoctor
+
+
+def doctor_names(doctor_incharge) -> list[str]:
+    """Distinct, trimmed, non-empty doctor names in their original order."""
+    names = []
+    for name in doctor_incharge or []:
+        name = (name or "").strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def add_patient_doctors(db: Session, patients: list[PatientDetails]):
+    """Insert patient_doctor rows for freshly registered patients. Caller commits."""
+    if any(patient.id is None for patient in patients):
+        db.flush()
+    rows = [
+        {"patient_id": patient.id, "doctor": name, "dateofreg": patient.dateofreg}
+        for patient in patients
+        for name in doctor_names(patient.doctorIncharge)
+    ]
+    if rows:
+        db.connection().execute(insert(PatientDoctor), rows)
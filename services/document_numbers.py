@@ -0,0 +1,125 @@
+"""Server-issued transaction and final bill numbers.
+
+Numbers come from a per-financial-year counter row in document_sequence. Each
+worker reserves a block of BLOCK_SIZE serials at a time with one UPDATE ...
+RETURNING in its own short transaction, as services.uhid does. It then hands
+them out from memory, so the counter row is touched once per block rather than
+once per request.
+
+The sequence tolerates gaps. Serials left in a block when a worker exits are
+never used, and numbers from different workers are not issued in commit order.
+Every number is still unique. Endpoints draw a number only once they are sure
+to insert a row, so idempotent replays and rejected requests use none.
+
+SQLite allows one writer at a time, so a second session could not commit a
+block while the request holds its write lock. There the serial is drawn in
+the caller's transaction, one at a time, and a rollback returns it.
+
+Clients may still send their own numbers, but not in the server's format,
+or a later issued number could collide with them (see is_server_number).
+
+The format is configurable per document type. The placeholders are {fy}
+("2526" for April 2025 - March 2026), {fy_start} (2025) and {serial}:
+
+    TRANSACTION_NO_FORMAT=TXN{fy}{serial:06d}
+    FINAL_BILL_NO_FORMAT=BILL{fy}{serial:06d}
+"""
+import os
+import re
+import string
+import threading
+from datetime import datetime, timezone
+import pytz
+from sqlalchemy import update
+from sqlmodel import Session
+from database import on_conflict_insert
+from models.document_sequence_model import DocumentSequence
+
+
+FORMATS = {
+    "transaction_no": os.getenv("TRANSACTION_NO_FORMAT", "TXN{fy}{serial:06d}"),
+    "final_bill_no": os.getenv("FINAL_BILL_NO_FORMAT", "BILL{fy}{serial:06d}"),
+}
+BLOCK_SIZE = int(os.getenv("DOCUMENT_NUMBER_BLOCK_SIZE", "20"))
+
+
+def financial_year_start(now: datetime) -> int:
+    """Indian financial years run April to March."""
+    return now.year if now.month >= 4 else now.year - 1
+
+
+def _advance(db: Session, name: str, period: str, size: int) -> int:
+    """Advance the counter by `size` in db's transaction; returns the last serial reserved."""
+    advance = (
+        update(DocumentSequence)
+        .where(DocumentSequence.name == name, DocumentSequence.period == period)
+        .values(last_serial=DocumentSequence.last_serial + size)
+        .returning(DocumentSequence.last_serial)
+    )
+    last_serial = db.exec(advance).scalar()
+    if last_serial is None:
+        db.exec(
+            on_conflict_insert(db, DocumentSequence)
+            .values(name=name, period=period, last_serial=0)
+            .on_conflict_do_nothing(index_elements=["name", "period"])
+        )
+        last_serial = db.exec(advance).scalar()
+    return last_serial
+
+
+def _reserve_block(db: Session, name: str, period: str, size: int) -> int:
+    """Advance the counter by `size` in its own transaction; returns the last serial reserved."""
+    with Session(db.get_bind()) as seq_db:
+        last_serial = _advance(seq_db, name, period, size)
+        seq_db.commit()
+    return last_serial
+
+
+class NumberBlocks:
+    """Per-worker cache of reserved serials, keyed by (name, period)."""
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def next_serial(self, db: Session, name: str, period: str) -> int:
+        if db.get_bind().dialect.name == "sqlite":
+            return _advance(db, name, period, 1)
+        with self._lock:
+            block = self._blocks.get((name, period))
+            if block is None or block[0] > block[1]:
+                last = _reserve_block(db, name, period, self.block_size)
+                block = self._blocks[(name, period)] = [last - self.block_size + 1, last]
+            serial = block[0]
+            block[0] += 1
+            return serial
+
+
+number_blocks = NumberBlocks(BLOCK_SIZE)
+
+
+def _number_pattern(template: str) -> re.Pattern:
+    parts = []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        parts.append(re.escape(literal))
+        if field is not None:
+            parts.append(r"\d+" if field == "serial" else r"\d{4}")
+    return re.compile("".join(parts))
+
+
+PATTERNS = {name: _number_pattern(template) for name, template in FORMATS.items()}
+
+
+def is_server_number(name: str, value: str) -> bool:
+    """True if `value` looks like a number issue_number() could hand out for `name`."""
+    return PATTERNS[name].fullmatch(value) is not None
+
+
+def issue_number(db: Session, name: str) -> str:
+    """Next number for `name` ("transaction_no" or "final_bill_no") in the current financial year."""
+    now = datetime.now(timezone.utc).astimezone(pytz.timezone("Asia/Kolkata"))
+    fy_start = financial_year_start(now)
+    fy = f"{fy_start % 100:02d}{(fy_start + 1) % 100:02d}"
+    serial = number_blocks.next_serial(db, name, fy)
+    return FORMATS[name].format(fy=fy, fy_start=fy_start, serial=serial)
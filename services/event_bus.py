@@ -0,0 +1,122 @@
+"""In-process and cross-worker event buses.
+
+LocalEventBus calls its subscribers in this process. PgNotifyEventBus fans
+messages out to every worker through Postgres NOTIFY/LISTEN on one channel:
+publish() sends a NOTIFY and each worker's listener thread delivers what it
+receives, its own messages included.
+
+Subclasses shape the wire format with encode()/decode() (NOTIFY payloads must
+stay under NOTIFY_PAYLOAD_LIMIT) and say what subscribers should get after the
+listener (re)connects, since anything may have been missed meanwhile.
+"""
+import json
+import logging
+import select as select_module
+import threading
+import time
+from typing import Callable
+from sqlalchemy import text
+
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_PAYLOAD_LIMIT = 7900  # Postgres rejects NOTIFY payloads of 8000 bytes or more
+
+
+class LocalEventBus:
+    """Delivers events to subscribers in this process only."""
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[dict], None]):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[dict], None]):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def subscribers(self) -> list:
+        with self._lock:
+            return list(self._subscribers)
+
+    def deliver(self, message: dict):
+        for callback in self.subscribers():
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("Event subscriber failed")
+
+    def publish(self, message: dict):
+        self.deliver(message)
+
+
+class PgNotifyEventBus(LocalEventBus):
+    """Fans events out to every worker through Postgres NOTIFY/LISTEN.
+
+    Messages published here are not delivered locally right away. The worker's
+    own listener receives them like any other worker does.
+    """
+
+    def __init__(self, engine, channel: str):
+        super().__init__()
+        self.engine = engine
+        self.channel = channel
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def encode(self, message: dict) -> str:
+        return json.dumps(message)
+
+    def decode(self, payload: str) -> dict:
+        return json.loads(payload)
+
+    def reconnect_message(self) -> dict:
+        """Delivered each time the listener (re)connects."""
+        raise NotImplementedError
+
+    def publish(self, message: dict):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                         {"channel": self.channel, "payload": self.encode(message)})
+            conn.commit()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._listen, name=f"{self.channel}-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _listen(self):
+        while not self._stopped.is_set():
+            raw = None
+            try:
+                raw = self.engine.raw_connection()
+                dbapi_conn = raw.driver_connection
+                dbapi_conn.autocommit = True
+                dbapi_conn.cursor().execute(f"LISTEN {self.channel}")
+                self.deliver(self.reconnect_message())
+                while not self._stopped.is_set():
+                    if select_module.select([dbapi_conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        notify = dbapi_conn.notifies.pop(0)
+                        self.deliver(self.decode(notify.payload))
+            except Exception:
+                logger.exception("%s listener lost its connection; retrying", self.channel)
+                time.sleep(1)
+            finally:
+                if raw is not None:
+                    raw.close()
+
+
+def switch_bus(old: LocalEventBus, new: LocalEventBus) -> LocalEventBus:
+    """Move every subscriber of `old` onto `new` and return `new`."""
+    for callback in old.subscribers():
+        new.subscribe(callback)
+    return new
@@ -0,0 +1,117 @@
+"""Idempotency-Key support for POST endpoints that must not run twice.
+
+A retried request that carries the same Idempotency-Key gets the stored
+response back, and no business table is read or written. The flow inside one
+transaction:
+
+1. replay_response() returns the stored response if the key is already
+   recorded. If the key was used with a different body it raises 422.
+2. claim_key() inserts the key row with ON CONFLICT. On Postgres a concurrent
+   request with the same key blocks here until the first one commits, then
+   sees the conflict and replays its response.
+3. The endpoint does its work, then calls store_response() before committing.
+   The key row and the business rows commit or roll back together.
+
+Keys live for IDEMPOTENCY_TTL_HOURS (default 24). Expired rows are reclaimed
+on conflict and purged at most every PURGE_INTERVAL seconds per worker.
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete
+from sqlmodel import Session, SQLModel, select
+from database import on_conflict_insert
+from models.idempotency_model import IdempotencyKey
+
+
+TTL = timedelta(hours=float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24")))
+PURGE_INTERVAL = 600
+
+_last_purge = 0.0
+_purge_lock = threading.Lock()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def request_fingerprint(req: SQLModel) -> str:
+    return hashlib.sha256(req.model_dump_json().encode()).hexdigest()
+
+
+def replay_response(db: Session, key: str, endpoint: str, fingerprint: str) -> Optional[JSONResponse]:
+    """The stored response for this key, or None if the key is new or expired."""
+    stored = db.exec(
+        select(IdempotencyKey).where(
+            IdempotencyKey.key == key,
+            IdempotencyKey.endpoint == endpoint,
+            IdempotencyKey.expires_at > _utcnow(),
+        )
+    ).first()
+    if not stored or stored.status_code is None:
+        return None
+    if stored.request_hash != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    return JSONResponse(
+        status_code=stored.status_code,
+        content=stored.response_body,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def claim_key(db: Session, key: str, endpoint: str, fingerprint: str) -> bool:
+    """Insert the key row in the caller's transaction; False if a live row already exists."""
+    _purge_expired(db)
+    now = _utcnow()
+    stmt = on_conflict_insert(db, IdempotencyKey).values(
+        key=key, endpoint=endpoint, request_hash=fingerprint, expires_at=now + TTL
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key", "endpoint"],
+        set_={
+            "request_hash": stmt.excluded.request_hash,
+            "status_code": None,
+            "response_body": None,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=IdempotencyKey.__table__.c.expires_at <= now,
+    ).returning(IdempotencyKey.key)
+    return db.exec(stmt).first() is not None
+
+
+def start_idempotent_request(db: Session, key: str, endpoint: str, req: SQLModel) -> Optional[JSONResponse]:
+    """Replay a stored response, or claim the key and return None so the endpoint runs."""
+    fingerprint = request_fingerprint(req)
+    replayed = replay_response(db, key, endpoint, fingerprint)
+    if replayed:
+        return replayed
+    if claim_key(db, key, endpoint, fingerprint):
+        return None
+    # A concurrent request with this key got there first; answer with its response
+    db.rollback()
+    replayed = replay_response(db, key, endpoint, fingerprint)
+    if replayed:
+        return replayed
+    raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed")
+
+
+def store_response(db: Session, key: str, endpoint: str, status_code: int, body: dict):
+    """Record the response on the claimed row; committed with the caller's work."""
+    stored = db.get(IdempotencyKey, (key, endpoint))
+    stored.status_code = status_code
+    stored.response_body = body
+    db.add(stored)
+
+
+def _purge_expired(db: Session):
+    global _last_purge
+    with _purge_lock:
+        if time.monotonic() - _last_purge < PURGE_INTERVAL:
+            return
+        _last_purge = time.monotonic()
+    db.exec(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _utcnow()))
@@ -0,0 +1,149 @@
+"""Prefix and typo-tolerant patient name search over fullname and fatherHusband.
+
+On Postgres the search runs in SQL with pg_trgm (word_similarity plus a prefix
+match), backed by the GIN trigram indexes from the migration. Other databases
+(SQLite in development and tests) use NgramIndex, an in-process trigram index
+that is filled lazily and then only reads rows newer than the last one it saw.
+
+Both paths search the current visit of each UHID only, keep matches whose
+similarity reaches MIN_SIMILARITY, and rank the same way: prefix matches
+first, then by trigram similarity.
+"""
+import threading
+from collections import defaultdict
+from typing import Optional
+from sqlalchemy import case, func, or_
+from sqlmodel import Session, select
+from models.patient_model import PatientCurrentVisit, PatientDetails
+
+
+# Shared cut-off; on Postgres it is set as pg_trgm.word_similarity_threshold
+MIN_SIMILARITY = 0.3
+REFRESH_BATCH_SIZE = 5000
+
+
+def trigrams(text: str) -> set:
+    """pg_trgm-style trigrams: lowercase words padded with two leading and one trailing space."""
+    grams = set()
+    for word in text.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _query_trigrams(query: str) -> set:
+    # The last word is usually still being typed, so do not require its word end
+    grams = set()
+    words = query.lower().split()
+    for position, word in enumerate(words):
+        padded = f"  {word} " if position < len(words) - 1 else f"  {word}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """In-process trigram index of the current visit's names, keyed by UHID."""
+
+    def __init__(self):
+        self._postings = defaultdict(set)   # trigram -> UHIDs
+        self._entries = {}                  # uhid -> (patient id, searchable names)
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def _add(self, uhid: str, patient_id: int, names: tuple):
+        previous = self._entries.get(uhid)
+        if previous is not None:
+            if previous[0] > patient_id:
+                return
+            for gram in trigrams(" ".join(previous[1])):
+                self._postings[gram].discard(uhid)
+        self._entries[uhid] = (patient_id, names)
+        for gram in trigrams(" ".join(names)):
+            self._postings[gram].add(uhid)
+
+    def refresh(self, db: Session):
+        """Index rows registered since the last refresh (new patients and new visits)."""
+        while True:
+            rows = db.exec(
+                select(PatientDetails.id, PatientDetails.uhid, PatientDetails.fullname, PatientDetails.fatherHusband)
+                .where(PatientDetails.id > self._last_id)
+                .order_by(PatientDetails.id)
+                .limit(REFRESH_BATCH_SIZE)
+            ).all()
+            for patient_id, uhid, fullname, father_husband in rows:
+                if uhid:
+                    self._add(uhid, patient_id, (fullname or "", father_husband or ""))
+            if rows:
+                self._last_id = rows[-1][0]
+            if len(rows) < REFRESH_BATCH_SIZE:
+                return
+
+    def search(self, db: Session, query: str, limit: int) -> list[int]:
+        """Return up to `limit` PatientDetails ids, best match first."""
+        with self._lock:
+            self.refresh(db)
+            query_grams = _query_trigrams(query)
+            if not query_grams:
+                return []
+
+            hits = defaultdict(int)
+            for gram in query_grams:
+                for uhid in self._postings.get(gram, ()):
+                    hits[uhid] += 1
+
+            needle = query.lower().strip()
+            ranked = []
+            for uhid, count in hits.items():
+                similarity = count / len(query_grams)
+                patient_id, names = self._entries[uhid]
+                is_prefix = any(
+                    name.lower().startswith(needle) or any(w.startswith(needle) for w in name.lower().split())
+                    for name in names
+                )
+                if is_prefix or similarity >= MIN_SIMILARITY:
+                    ranked.append((is_prefix, similarity, patient_id))
+
+        ranked.sort(reverse=True)
+        return [patient_id for _, _, patient_id in ranked[:limit]]
+
+
+_fallback_index = NgramIndex()
+
+
+def search_patients_by_name(db: Session, query: str, limit: int = 20, index: Optional[NgramIndex] = None) -> list[PatientDetails]:
+    if db.get_bind().dialect.name == "postgresql":
+        return _search_postgres(db, query, limit)
+
+    ids = (index or _fallback_index).search(db, query, limit)
+    if not ids:
+        return []
+    patients = {p.id: p for p in db.exec(select(PatientDetails).where(PatientDetails.id.in_(ids))).all()}
+    return [patients[i] for i in ids if i in patients]
+
+
+def _search_postgres(db: Session, query: str, limit: int) -> list[PatientDetails]:
+    needle = query.strip()
+    prefix = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    word_prefix = "% " + prefix
+    is_prefix = or_(
+        PatientDetails.fullname.ilike(prefix), PatientDetails.fullname.ilike(word_prefix),
+        PatientDetails.fatherHusband.ilike(prefix), PatientDetails.fatherHusband.ilike(word_prefix),
+    )
+    similarity = func.greatest(
+        func.word_similarity(needle, PatientDetails.fullname),
+        func.word_similarity(needle, PatientDetails.fatherHusband),
+    )
+    # %> compares against pg_trgm.word_similarity_threshold (default 0.6);
+    # apply MIN_SIMILARITY for this transaction so both paths agree
+    db.exec(select(func.set_config("pg_trgm.word_similarity_threshold", str(MIN_SIMILARITY), True)))
+    return db.exec(
+        select(PatientDetails)
+        .join(PatientCurrentVisit, PatientCurrentVisit.patient_id == PatientDetails.id)
+        .where(or_(
+            is_prefix,
+            PatientDetails.fullname.op("%>")(needle),
+            PatientDetails.fatherHusband.op("%>")(needle),
+        ))
+        .order_by(case((is_prefix, 1), else_=0).desc(), similarity.desc(), PatientDetails.id.desc())
+        .limit(limit)
+    ).all()
@@ -0,0 +1,118 @@
+"""Read-through cache of the latest PatientDetails snapshot per UHID.
+
+One admission looks the same UHID up again and again (bed allotment, every
+transaction, bill preparation, TPA). get_cached_latest_visit() serves those
+read-only lookups from a size-bounded LRU with a TTL; the patient POST/PUT/PATCH
+routes call invalidate_patient() after they commit.
+
+Each worker has its own LRU, so invalidations go out on an event bus: the
+local one by default, PgNotifyPatientCacheBus on Postgres so every worker
+drops the entry (main.py installs it at startup). A load that raced with an
+invalidation is not cached, so an old visit cannot be put back afterwards.
+
+The backend is pluggable: anything with get/set/delete/clear can be installed
+with set_patient_cache_backend(), e.g. a shared store for multi-worker
+deployments (tests use the DictCache fake in tests/fakes.py).
+Cached values are plain dicts, and every hit builds a new, session-less
+PatientDetails, so callers must not add the result back to a session.
+"""
+import logging
+import os
+import threading
+from typing import Optional
+from sqlmodel import Session
+from models.patient_model import PatientDetails
+from services.cache import LRUCache
+from services.event_bus import LocalEventBus, PgNotifyEventBus, switch_bus
+from services.visits import get_latest_visit
+
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "patient_cache"
+# Delivered when the listener (re)connects: drop everything, anything may have changed
+CLEAR_ALL = {"uhid": None}
+
+_backend = LRUCache(
+    max_size=int(os.getenv("PATIENT_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("PATIENT_CACHE_TTL", "60")),
+)
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_lock = threading.Lock()
+_generation = 0  # bumped by every invalidation this worker receives
+
+
+class PgNotifyPatientCacheBus(PgNotifyEventBus):
+    def __init__(self, engine):
+        super().__init__(engine, NOTIFY_CHANNEL)
+
+    def reconnect_message(self) -> dict:
+        return dict(CLEAR_ALL)
+
+
+def _count(name: str):
+    with _lock:
+        _stats[name] += 1
+
+
+def _on_invalidation(message: dict):
+    global _generation
+    with _lock:
+        _generation += 1
+    if message.get("uhid") is None:
+        _backend.clear()
+    else:
+        _backend.delete(message["uhid"])
+
+
+patient_cache_bus = LocalEventBus()
+patient_cache_bus.subscribe(_on_invalidation)
+
+
+def set_patient_cache_bus(bus: LocalEventBus):
+    """Swap the invalidation bus (e.g. PgNotifyPatientCacheBus at startup), keeping subscribers."""
+    global patient_cache_bus
+    patient_cache_bus = switch_bus(patient_cache_bus, bus)
+
+
+def set_patient_cache_backend(backend):
+    """Swap the cache store (must provide get/set/delete/clear)."""
+    global _backend
+    _backend = backend
+
+
+def get_patient_cache_stats() -> dict:
+    with _lock:
+        return dict(_stats)
+
+
+def get_cached_latest_visit(db: Session, uhid: str) -> Optional[PatientDetails]:
+    """Latest visit for `uhid` for read-only use, served from cache when possible."""
+    snapshot = _backend.get(uhid)
+    if snapshot is not None:
+        _count("hits")
+        return PatientDetails.model_validate(snapshot)
+
+    _count("misses")
+    with _lock:
+        generation = _generation
+    patient = get_latest_visit(db, uhid)
+    if patient is not None:
+        with _lock:
+            # An invalidation during the load may mean we read the old visit
+            if generation == _generation:
+                _backend.set(uhid, patient.model_dump())
+    return patient
+
+
+def invalidate_patient(uhid: Optional[str]):
+    """Drop `uhid` here at once and on every other worker through the bus."""
+    if not uhid:
+        return
+    _count("invalidations")
+    _on_invalidation({"uhid": uhid})
+    try:
+        patient_cache_bus.publish({"uhid": uhid})
+    except Exception:
+        # Other workers' entries still expire after PATIENT_CACHE_TTL
+        logger.exception("Could not publish patient cache invalidation")
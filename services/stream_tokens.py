@@ -0,0 +1,36 @@
+"""Short-lived tokens that let a browser EventSource open /beds/stream.
+
+EventSource cannot send the x-api-key header, so the page first calls
+POST /beds/stream/token with the key and then opens
+/beds/stream?token=<token>. A token is "<expiry>.<signature>", where the
+signature is an HMAC-SHA256 of the expiry keyed with API_KEY. Any worker can
+check it without shared state.
+"""
+import hashlib
+import hmac
+import os
+import time
+from typing import Optional
+
+
+# Seconds a token stays valid for opening a stream; an open stream is not cut off
+STREAM_TOKEN_TTL = int(os.getenv("STREAM_TOKEN_TTL", "60"))
+
+
+def _signature(expires: int) -> str:
+    key = os.getenv("API_KEY", "").encode()
+    return hmac.new(key, str(expires).encode(), hashlib.sha256).hexdigest()
+
+
+def issue_stream_token(now: Optional[float] = None) -> str:
+    expires = int(now if now is not None else time.time()) + STREAM_TOKEN_TTL
+    return f"{expires}.{_signature(expires)}"
+
+
+def verify_stream_token(token: str, now: Optional[float] = None) -> bool:
+    expires, _, signature = token.partition(".")
+    if not (expires.isascii() and expires.isdigit()):
+        return False
+    if not hmac.compare_digest(signature.encode(), _signature(int(expires)).encode()):
+        return False
+    return int(expires) >= (now if now is not None else time.time())
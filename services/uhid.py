@@ -0,0 +1,61 @@
+"""Per-month UHID allocator backed by the uhid_sequence table.
+
+UHIDs look like YYMMnnnn. Instead of sorting patientdetails.uhid on every
+registration, each month keeps a counter row that is advanced with a single
+UPDATE ... RETURNING. The counter moves in its own short transaction, like a
+database sequence, so the row lock is never held for the length of a
+registration; a rolled back registration simply leaves a gap.
+"""
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+from database import on_conflict_insert
+from models.patient_model import PatientDetails
+from models.uhid_sequence_model import UhidSequence
+
+
+MAX_SERIAL = 9999
+
+
+def _advance(db: Session, period: str, count: int):
+    return db.exec(
+        update(UhidSequence)
+        .where(UhidSequence.period == period)
+        .values(last_serial=UhidSequence.last_serial + count)
+        .returning(UhidSequence.last_serial)
+    ).scalar()
+
+
+def _seed(db: Session, period: str):
+    """Create the counter row for a period, starting after any UHID already issued."""
+    last_uhid = db.exec(
+        select(func.max(PatientDetails.uhid)).where(
+            PatientDetails.uhid >= f"{period}0000",
+            PatientDetails.uhid <= f"{period}{MAX_SERIAL}"
+        )
+    ).one()
+    last_serial = int(last_uhid[-4:]) if last_uhid else 0
+    db.exec(
+        on_conflict_insert(db, UhidSequence)
+        .values(period=period, last_serial=last_serial)
+        .on_conflict_do_nothing(index_elements=["period"])
+    )
+
+
+def reserve_uhids(db: Session, period: str, count: int = 1) -> list[str]:
+    """Atomically reserve `count` consecutive UHIDs for the YYMM `period`."""
+    with Session(db.get_bind()) as seq_db:
+        last_serial = _advance(seq_db, period, count)
+        if last_serial is None:
+            _seed(seq_db, period)
+            last_serial = _advance(seq_db, period, count)
+        if last_serial > MAX_SERIAL:
+            seq_db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail=f"UHID serials for period {period} are exhausted"
+            )
+        seq_db.commit()
+
+    first_serial = last_serial - count + 1
+    return [f"{period}{serial:04d}" for serial in range(first_serial, last_serial + 1)]
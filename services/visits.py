@@ -0,0 +1,51 @@
+"""Latest-visit lookups through the patient_current_visit pointer table.
+
+Every PatientDetails row is one registration (visit) of a UHID. Handlers that
+need "the current visit" used to sort all visits of a UHID by the regno string;
+instead create_patient and update_patient_by_uhid record the newest row id in
+patient_current_visit, and lookups become a primary-key join.
+"""
+from typing import Optional
+from sqlmodel import Session, select
+from database import on_conflict_insert
+from models.patient_model import PatientCurrentVisit, PatientDetails
+
+
+def set_current_visit(db: Session, patient: PatientDetails):
+    """Record `patient` as the latest visit of its UHID. Caller commits."""
+    if patient.id is None:
+        db.flush()
+    set_current_visits(db, [(patient.uhid, patient.id)])
+
+
+def set_current_visits(db: Session, visits: list[tuple[str, int]]):
+    """Bulk form of set_current_visit for (uhid, patient_id) pairs, one statement."""
+    if not visits:
+        return
+    stmt = on_conflict_insert(db, PatientCurrentVisit)
+    db.connection().execute(
+        stmt.on_conflict_do_update(
+            index_elements=["uhid"],
+            set_={"patient_id": stmt.excluded.patient_id},
+        ),
+        [{"uhid": uhid, "patient_id": patient_id} for uhid, patient_id in visits],
+    )
+
+
+def get_latest_visit(db: Session, uhid: str) -> Optional[PatientDetails]:
+    """Return the latest PatientDetails row for `uhid`, or None."""
+    patient = db.exec(
+        select(PatientDetails)
+        .join(PatientCurrentVisit, PatientCurrentVisit.patient_id == PatientDetails.id)
+        .where(PatientCurrentVisit.uhid == uhid)
+    ).first()
+    if patient is not None:
+        return patient
+
+    # UHIDs registered before the pointer table existed and not yet backfilled
+    return db.exec(
+        select(PatientDetails)
+        .where(PatientDetails.uhid == uhid)
+        .order_by(PatientDetails.regno.desc(), PatientDetails.id.desc())
+        .limit(1)
+    ).first()
@@ -0,0 +1,33 @@
+"""Point the app at a throwaway SQLite file before database.py creates its engine.
+
+The tests hit a file-backed database from many threads at once, so every
+session gets a real connection with its own transaction.
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="kkhospital-tests-")
+os.environ["Prod_DB_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("API_KEY", "test")
+os.environ.setdefault("SYNC_BEDS_ON_STARTUP", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel
+
+import main  # noqa: F401  (imports every model so create_all sees all tables)
+from database import engine
+
+
+@pytest.fixture(autouse=True)
+def fresh_schema():
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    """TestClient sending the API key the app was started with."""
+    with TestClient(main.app, headers={"x-api-key": os.environ["API_KEY"]}) as test_client:
+        yield test_client
@@ -0,0 +1,23 @@
+"""Stand-ins for shared infrastructure that the tests do not run."""
+
+
+class DictCache:
+    """Patient cache backend with the shared-store interface, kept in a dict.
+
+    Several "workers" can be pointed at one instance to model a shared store.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        self.entries[key] = value
+
+    def delete(self, key):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,23 @@
+"""Minimal valid request bodies shared by the API tests."""
+
+ADDRESS = {"address": "a", "city": "Lucknow", "state": "UP", "country": "IN", "zip": "226001"}
+
+TRANSACTION = {
+    "patient_uhid": "26100001", "patient_regno": "001", "patient_name": "P",
+    "admission_date": "2026-10-01", "transaction_purpose": "ADVANCE", "amount": "100",
+    "payment_mode": "CASH", "transaction_date": "2026-10-18", "created_by": "x",
+}
+
+BILL = {
+    "patient_uhid": "26100001", "patient_regno": "001", "patient_name": "P", "patient_type": "IPD",
+    "age": "30", "gender": "M", "admission_date": "2026-10-01", "admission_time": "10:00:00",
+    "discharge_date": "2026-10-18", "discharge_time": "18:45:00",
+    "consultant_doctor": "D", "empanelment": "NONE", "room_type": "GEN", "bed_no": "E-1",
+    "total_charges": "100", "created_by": "x",
+}
+
+PATIENT = {
+    "fullname": "Asha Verma", "patient_type": "OPD", "religion": "r", "maritalStatus": "m",
+    "fatherHusband": "f", "doctorIncharge": ["D"], "regAmount": 10,
+    "localAddress": ADDRESS, "permanentAddress": ADDRESS, "registered_by": "x",
+}
@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+
+import main
+from services.stream_tokens import STREAM_TOKEN_TTL, issue_stream_token, verify_stream_token
+
+
+def test_stream_token_requires_the_api_key():
+    with TestClient(main.app) as anonymous:
+        assert anonymous.post("/beds/stream/token").status_code == 403
+
+
+def test_stream_token_expires():
+    token = issue_stream_token(now=1_000_000)
+    assert verify_stream_token(token, now=1_000_000 + STREAM_TOKEN_TTL)
+    assert not verify_stream_token(token, now=1_000_001 + STREAM_TOKEN_TTL)
+
+
+def test_tampered_stream_token_is_rejected():
+    expires, signature = issue_stream_token().split(".")
+    assert not verify_stream_token(f"{int(expires) + 3600}.{signature}")
+    assert not verify_stream_token(f"{expires}.{signature[:-1]}é")
+    assert not verify_stream_token("not-a-token")
+
+
+def test_stream_rejects_a_bad_token_without_the_api_key(client):
+    token = client.post("/beds/stream/token").json()["token"]
+    with TestClient(main.app) as browser:
+        assert browser.get("/beds/stream").status_code == 422
+        assert browser.get("/beds/stream", params={"token": "1." + token.split(".")[1]}).status_code == 403
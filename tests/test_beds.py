@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, func, select
+
+from database import engine
+from models.bed_model import BedDetails
+from routers.bed_alot import create_bed
+from schemas.bed_schemas import BedDetailsCreateSchema
+
+
+WORKERS = 8
+
+
+@pytest.fixture
+def beds():
+    with Session(engine) as db:
+        for number in range(1, WORKERS + 1):
+            db.add(BedDetails(department="ICU", bed_number=f"ICU-{number}", status="available", patient_name=""))
+        db.commit()
+
+
+def occupied_beds(uhid: str) -> int:
+    with Session(engine) as db:
+        return db.exec(
+            select(func.count()).select_from(BedDetails)
+            .where(BedDetails.uhid == uhid, BedDetails.status == "occupied")
+        ).one()
+
+
+def test_occupied_uhid_index_rejects_a_second_bed(beds):
+    with Session(engine) as db:
+        first, second = db.exec(select(BedDetails).order_by(BedDetails.bed_id).limit(2)).all()
+        for bed in (first, second):
+            bed.uhid, bed.status = "26100001", "occupied"
+        with pytest.raises(IntegrityError):
+            db.commit()
+
+
+def test_racing_allotments_give_a_uhid_one_bed(beds):
+    barrier = Barrier(WORKERS)
+
+    def allot(number: int):
+        req = BedDetailsCreateSchema(
+            uhid="26100001", patient_name="Racer", department="ICU", bed_number=f"ICU-{number}"
+        )
+        with Session(engine) as db:
+            barrier.wait()
+            try:
+                return create_bed(req, db).bed_number
+            except HTTPException as exc:
+                return exc.status_code
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        results = list(pool.map(allot, range(1, WORKERS + 1)))
+
+    allotted = [r for r in results if isinstance(r, str)]
+    assert len(allotted) == 1
+    assert all(r in (403, 409) for r in results if not isinstance(r, str))
+    assert occupied_beds("26100001") == 1
@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from payloads import TRANSACTION
+
+
+def serial(number: str) -> int:
+    return int(number[-6:])
+
+
+def test_replays_do_not_use_up_numbers(client):
+    body = {**TRANSACTION, "transaction_time": "10:00:00"}
+    retry = {"Idempotency-Key": "retry-1"}
+
+    with ThreadPoolExecutor(10) as pool:
+        responses = list(pool.map(lambda _: client.post("/transactions", json=body, headers=retry), range(10)))
+    assert {r.status_code for r in responses} == {200}
+    first = {r.json()["transaction_no"] for r in responses}
+    assert len(first) == 1
+
+    following = client.post("/transactions", json=body).json()["transaction_no"]
+    assert serial(following) == serial(first.pop()) + 1
+
+
+def test_client_numbers_in_the_server_format_are_rejected(client):
+    body = {**TRANSACTION, "transaction_time": "10:00:00"}
+    issued = client.post("/transactions", json=body).json()["transaction_no"]
+    taken = issued[:-6] + f"{serial(issued) + 1:06d}"
+
+    rejected = client.post("/transactions", json={**body, "transaction_no": taken})
+    assert rejected.status_code == 400
+    assert client.post("/transactions", json={**body, "transaction_no": "MANUAL-17"}).status_code == 200
+    assert client.post("/transactions", json=body).json()["transaction_no"] == taken
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session
+
+import services.name_search as name_search
+from database import engine
+from payloads import PATIENT
+from services.name_search import MIN_SIMILARITY, NgramIndex
+
+
+class RecordingPostgresSession:
+    """Stands in for a Postgres session and keeps every statement it is given."""
+
+    def __init__(self):
+        self.statements = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def exec(self, statement):
+        self.statements.append(str(statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )))
+        return SimpleNamespace(all=list)
+
+
+def test_postgres_search_uses_the_shared_threshold():
+    db = RecordingPostgresSession()
+    name_search.search_patients_by_name(db, "Rqvi")
+
+    threshold, search = db.statements
+    assert f"set_config('pg_trgm.word_similarity_threshold', '{MIN_SIMILARITY}', true)" in threshold
+    assert "%>" in search
+
+
+def test_fallback_index_cuts_off_at_the_shared_threshold(client, monkeypatch):
+    client.post("/patient", json={**PATIENT, "fullname": "Ravi Kumar", "fatherHusband": "Mohan"}).raise_for_status()
+    with Session(engine) as db:
+        # "rqvi" shares one of its four trigrams ("  r") with "Ravi Kumar"
+        monkeypatch.setattr(name_search, "MIN_SIMILARITY", 0.25)
+        assert len(NgramIndex().search(db, "Rqvi", 10)) == 1
+        monkeypatch.setattr(name_search, "MIN_SIMILARITY", 0.26)
+        assert NgramIndex().search(db, "Rqvi", 10) == []
@@ -0,0 +1,49 @@
+import json
+
+from payloads import PATIENT
+from routers.patient import BULK_MAX_ROWS
+
+
+def test_bulk_json_registers_valid_rows_and_reports_the_rest(client):
+    rows = [PATIENT, {**PATIENT, "fullname": None}, {**PATIENT, "fullname": "Ravi Kumar"}]
+    response = client.post("/patient/bulk", json=rows)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["received"], body["registered"], body["failed"]) == (3, 2, 1)
+    assert [p["row"] for p in body["patients"]] == [0, 2]
+    assert len({p["uhid"] for p in body["patients"]}) == 2
+    assert body["errors"][0]["row"] == 1
+
+
+def test_bulk_ndjson_reports_a_malformed_line_as_its_row(client):
+    body = "\n".join([json.dumps(PATIENT), "{not json", json.dumps(PATIENT)]) + "\n"
+    response = client.post("/patient/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert response.json()["registered"] == 2
+    assert response.json()["errors"][0]["row"] == 1
+    assert response.json()["errors"][0]["errors"][0].startswith("Invalid JSON")
+
+
+def test_bulk_rejects_a_body_that_is_not_utf8(client):
+    body = json.dumps([PATIENT]).replace("Asha", "Asha \xe9").encode("latin-1")
+    for content_type in ("application/json", "application/x-ndjson"):
+        response = client.post("/patient/bulk", content=body, headers={"content-type": content_type})
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Body must be UTF-8 encoded")
+
+
+def test_bulk_rejects_malformed_json_with_the_same_shape(client):
+    response = client.post("/patient/bulk", content=b"[{", headers={"content-type": "application/json"})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid JSON body")
+
+    response = client.post("/patient/bulk", json=PATIENT)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Body must be a JSON array or NDJSON"
+
+
+def test_bulk_caps_the_number_of_rows(client):
+    response = client.post("/patient/bulk", json=[{}] * (BULK_MAX_ROWS + 1))
+    assert response.status_code == 413
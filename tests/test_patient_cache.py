@@ -0,0 +1,86 @@
+import pytest
+from sqlmodel import Session
+
+import services.patient_cache as patient_cache
+from database import engine
+from fakes import DictCache
+from payloads import PATIENT
+from services.cache import LRUCache
+
+
+@pytest.fixture
+def backend():
+    store = DictCache()
+    patient_cache.set_patient_cache_backend(store)
+    yield store
+    patient_cache.set_patient_cache_backend(LRUCache())
+
+
+@pytest.fixture
+def uhid(client):
+    return client.post("/patient", json=PATIENT).json()["uhid"]
+
+
+def lookup(uhid: str):
+    with Session(engine) as db:
+        return patient_cache.get_cached_latest_visit(db, uhid)
+
+
+def stats_after(action) -> dict:
+    before = patient_cache.get_patient_cache_stats()
+    action()
+    after = patient_cache.get_patient_cache_stats()
+    return {name: after[name] - before[name] for name in after}
+
+
+def test_repeat_lookups_are_hits(backend, uhid):
+    assert stats_after(lambda: lookup(uhid)) == {"hits": 0, "misses": 1, "invalidations": 0}
+    assert uhid in backend.entries
+    assert stats_after(lambda: lookup(uhid)) == {"hits": 1, "misses": 0, "invalidations": 0}
+    assert lookup(uhid).regno == "001"
+
+
+def test_entries_expire_after_the_ttl(uhid):
+    now = [0.0]
+    patient_cache.set_patient_cache_backend(LRUCache(ttl_seconds=60, clock=lambda: now[0]))
+    try:
+        lookup(uhid)
+        now[0] = 59
+        assert stats_after(lambda: lookup(uhid))["hits"] == 1
+        now[0] = 121
+        assert stats_after(lambda: lookup(uhid))["misses"] == 1
+    finally:
+        patient_cache.set_patient_cache_backend(LRUCache())
+
+
+def test_new_visit_invalidates_the_entry(client, backend, uhid):
+    assert lookup(uhid).regno == "001"
+    assert client.put(f"/patient/{uhid}", json={"patient_type": "IPD"}).status_code == 200
+    assert uhid not in backend.entries
+    assert lookup(uhid).regno == "002"
+
+
+def test_invalidations_from_other_workers_drop_entries(backend, client, uhid):
+    other = client.post("/patient", json=PATIENT).json()["uhid"]
+    lookup(uhid), lookup(other)
+
+    # What the NOTIFY listener delivers when another worker writes
+    patient_cache.patient_cache_bus.deliver({"uhid": uhid})
+    assert set(backend.entries) == {other}
+
+    # ...and when it reconnects after possibly missing some
+    patient_cache.patient_cache_bus.deliver(patient_cache.CLEAR_ALL)
+    assert backend.entries == {}
+
+
+def test_load_racing_an_invalidation_is_not_cached(backend, uhid, monkeypatch):
+    load = patient_cache.get_latest_visit
+
+    def load_then_invalidate(db, key):
+        patient = load(db, key)
+        patient_cache.invalidate_patient(key)  # another request commits a new visit meanwhile
+        return patient
+
+    monkeypatch.setattr(patient_cache, "get_latest_visit", load_then_invalidate)
+    lookup(uhid)
+    assert backend.entries == {}
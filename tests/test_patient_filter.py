@@ -0,0 +1,37 @@
+from payloads import BILL, PATIENT
+
+
+def test_a_visit_with_several_bills_is_listed_once(client):
+    patient = client.post("/patient", json={**PATIENT, "patient_type": "IPD"}).json()
+    visit = {"patient_uhid": patient["uhid"], "patient_regno": patient["regno"]}
+    for discharge_date in ("2026-10-17", "2026-10-18"):
+        client.post("/final-bill", json={**BILL, **visit, "discharge_date": discharge_date}).raise_for_status()
+    client.post("/patient", json={**PATIENT, "fullname": "Ravi Kumar"}).raise_for_status()
+
+    response = client.get("/patients/filter")
+
+    assert response.status_code == 200
+    rows = response.json()
+    assert sorted(row["uhid"] for row in rows) == sorted({row["uhid"] for row in rows})
+    assert response.headers["X-Total-Count"] == str(len(rows)) == "2"
+    billed = next(row for row in rows if row["uhid"] == patient["uhid"])
+    assert billed["dischargedate"] == "2026-10-18"
+
+
+def test_pages_follow_the_cursor_without_repeats(client):
+    for number in range(5):
+        patient = client.post("/patient", json={**PATIENT, "fullname": f"Patient {number}"}).json()
+        visit = {"patient_uhid": patient["uhid"], "patient_regno": patient["regno"]}
+        for _ in range(2):
+            client.post("/final-bill", json={**BILL, **visit}).raise_for_status()
+
+    seen, before = [], None
+    while True:
+        params = {"limit": 2, **({"before": before} if before else {})}
+        response = client.get("/patients/filter", params=params)
+        seen.extend(row["uhid"] for row in response.json())
+        before = response.headers.get("X-Next-Before")
+        if not before:
+            break
+
+    assert len(seen) == len(set(seen)) == 5
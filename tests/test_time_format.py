@@ -0,0 +1,31 @@
+"""Each time column comes back in the format it always had on the wire."""
+import pytest
+
+from payloads import BILL, PATIENT, TRANSACTION
+
+
+@pytest.mark.parametrize("sent, returned", [("15:30:00", "15:30:00"), ("03:30:00 PM", "15:30:00")])
+def test_transaction_time_is_24_hour(client, sent, returned):
+    created = client.post("/transactions", json={**TRANSACTION, "transaction_time": sent})
+    assert created.status_code == 200
+    assert created.json()["transaction_time"] == returned
+
+    listed = client.get("/transactions/summary/26100001").json()
+    assert [t["transaction_time"] for t in listed] == [returned]
+
+
+@pytest.mark.parametrize("field", ["admission_time", "discharge_time"])
+def test_bill_times_are_24_hour(client, field):
+    times = {"admission_time": "10:00:00", "discharge_time": "18:45:00", field: "09:05:00 PM"}
+    created = client.post("/final-bill", json={**BILL, **times})
+    assert created.status_code == 200
+    expected = {**times, field: "21:05:00"}
+    for body in (created.json(), client.get("/final-bill/26100001").json()[0]):
+        assert {name: body[name] for name in times} == expected
+
+
+@pytest.mark.parametrize("sent, returned", [("03:30:00 PM", "03:30:00 PM"), ("15:30:00", "03:30:00 PM")])
+def test_registration_time_is_12_hour(client, sent, returned):
+    patient = {**PATIENT, "time": sent, "dateofreg": "2026-10-18"}
+    uhid = client.post("/patient", json=patient).json()["uhid"]
+    assert client.get(f"/patient/{uhid}").json()[0]["time"] == returned
@@ -0,0 +1,73 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import cycle
+from threading import Barrier, Lock
+
+import pytz
+from sqlmodel import Session
+
+import routers.patient
+from database import engine
+from payloads import PATIENT
+from services.uhid import reserve_uhids
+
+
+WORKERS = 8
+CALLS_PER_WORKER = 10
+REGISTRATIONS = 200
+
+
+def test_concurrent_reservations_never_share_a_uhid():
+    barrier = Barrier(WORKERS)
+
+    def reserve(worker: int) -> list[str]:
+        barrier.wait()
+        uhids = []
+        for call in range(CALLS_PER_WORKER):
+            with Session(engine) as db:
+                uhids.extend(reserve_uhids(db, "2610", count=1 + (worker + call) % 3))
+        return uhids
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        issued = [uhid for batch in pool.map(reserve, range(WORKERS)) for uhid in batch]
+
+    assert len(issued) == len(set(issued))
+    # Blocks are consecutive, so together they cover the serials without gaps
+    assert sorted(issued) == [f"2610{serial:04d}" for serial in range(1, len(issued) + 1)]
+
+
+def test_reservations_are_per_period():
+    with Session(engine) as db:
+        assert reserve_uhids(db, "2610", count=2) == ["26100001", "26100002"]
+        assert reserve_uhids(db, "2611") == ["26110001"]
+        assert reserve_uhids(db, "2610") == ["26100003"]
+
+
+def test_parallel_registrations_get_contiguous_uhids_per_month(client, monkeypatch):
+    # Registrations straddle a month end, so two counters are advanced at once
+    ist = pytz.timezone("Asia/Kolkata")
+    months = cycle([ist.localize(datetime(2026, 10, 31, 23, 59)), ist.localize(datetime(2026, 11, 1, 0, 1))])
+    months_lock = Lock()
+
+    def clock():
+        with months_lock:
+            return next(months)
+
+    monkeypatch.setattr(routers.patient, "get_current_ist_time", clock)
+
+    def register(number: int) -> str:
+        response = client.post("/patient", json={**PATIENT, "fullname": f"Patient {number}"})
+        assert response.status_code == 200, response.text
+        return response.json()["uhid"]
+
+    with ThreadPoolExecutor(32) as pool:
+        issued = list(pool.map(register, range(REGISTRATIONS)))
+
+    assert len(set(issued)) == REGISTRATIONS
+    serials = defaultdict(list)
+    for uhid in issued:
+        serials[uhid[:4]].append(int(uhid[4:]))
+    assert set(serials) == {"2610", "2611"}
+    for period_serials in serials.values():
+        assert sorted(period_serials) == list(range(1, len(period_serials) + 1))